@@ -0,0 +1,33 @@
+"""add conversation context summary and message token counts
+
+Revision ID: 604bdc5943bb
+Revises: 29560a05b59e
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "604bdc5943bb"
+down_revision: Union[str, None] = "29560a05b59e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("token_count", sa.Integer(), nullable=True))
+    op.add_column("conversations", sa.Column("context_summary", sa.Text(), nullable=True))
+    op.add_column(
+        "conversations",
+        sa.Column("context_summary_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("conversations", "context_summary_until")
+    op.drop_column("conversations", "context_summary")
+    op.drop_column("messages", "token_count")
@@ -0,0 +1,32 @@
+"""add per-turn usage and latency columns to messages
+
+Revision ID: 8d2e6b1f4a90
+Revises: 604bdc5943bb
+Create Date: 2026-10-17 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e6b1f4a90"
+down_revision: Union[str, None] = "604bdc5943bb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("prompt_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("completion_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("ttft_ms", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("duration_ms", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "duration_ms")
+    op.drop_column("messages", "ttft_ms")
+    op.drop_column("messages", "completion_tokens")
+    op.drop_column("messages", "prompt_tokens")
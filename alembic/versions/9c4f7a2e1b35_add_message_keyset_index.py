@@ -0,0 +1,28 @@
+"""add composite index for keyset pagination of messages
+
+Revision ID: 9c4f7a2e1b35
+Revises: 8d2e6b1f4a90
+Create Date: 2026-10-17 13:42:08.215604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4f7a2e1b35"
+down_revision: Union[str, None] = "8d2e6b1f4a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_conversation_created_id",
+        "messages",
+        ["conversation_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_conversation_created_id", table_name="messages")
@@ -0,0 +1,68 @@
+"""add denormalized message counters and preview to conversations
+
+Revision ID: b7e3d5f91c28
+Revises: 9c4f7a2e1b35
+Create Date: 2026-10-17 15:20:44.903117
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3d5f91c28"
+down_revision: Union[str, None] = "9c4f7a2e1b35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "conversations",
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "conversations", sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("conversations", sa.Column("last_message_preview", sa.String(), nullable=True))
+
+    # Backfill from existing messages
+    op.execute(
+        """
+        UPDATE conversations AS c
+        SET message_count = s.message_count, last_message_at = s.last_message_at
+        FROM (
+            SELECT conversation_id, count(*) AS message_count, max(created_at) AS last_message_at
+            FROM messages
+            GROUP BY conversation_id
+        ) AS s
+        WHERE s.conversation_id = c.id
+        """
+    )
+    op.execute(
+        r"""
+        UPDATE conversations AS c
+        SET last_message_preview = left(btrim(regexp_replace(m.content, '\s+', ' ', 'g')), 120)
+        FROM (
+            SELECT DISTINCT ON (conversation_id) conversation_id, content
+            FROM messages
+            ORDER BY conversation_id, created_at DESC
+        ) AS m
+        WHERE m.conversation_id = c.id
+        """
+    )
+
+    op.create_index(
+        "ix_conversations_user_deleted_updated",
+        "conversations",
+        ["user_id", "is_deleted", sa.text("updated_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversations_user_deleted_updated", table_name="conversations")
+    op.drop_column("conversations", "last_message_preview")
+    op.drop_column("conversations", "last_message_at")
+    op.drop_column("conversations", "message_count")
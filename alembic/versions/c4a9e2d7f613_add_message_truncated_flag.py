@@ -0,0 +1,29 @@
+"""add truncated flag to messages
+
+Revision ID: c4a9e2d7f613
+Revises: b7e3d5f91c28
+Create Date: 2026-10-17 17:05:12.660481
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e2d7f613"
+down_revision: Union[str, None] = "b7e3d5f91c28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "messages",
+        sa.Column("truncated", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("messages", "truncated")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: N concurrent SSE clients chatting through the real app and database.
+
+Serves src.main:app with uvicorn inside this process and drives it over HTTP, so
+every turn goes through auth, admission, the agent pool, tools and persistence
+against the configured Postgres. The LLM is the recorded-stream stand-in
+(AGENT_LLM_BACKEND=fake) unless another backend is set explicitly; tune it with
+AGENT_FAKE_LLM_FIRST_TOKEN_MS and AGENT_FAKE_LLM_TOKEN_DELAY_MS.
+
+Reports time to first token, p50/p99 end-to-end latency, event-loop lag on the shared
+loop and database queries per turn. Each client is its own throwaway user (per-user
+stream limits would otherwise cap concurrency); all of them are removed afterwards.
+
+Usage:
+    poetry run python scripts/bench_chat_load.py [--clients 50] [--turns 3] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Must be set before the app's config is imported
+os.environ.setdefault("AGENT_LLM_BACKEND", "fake")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from src.agent.db_model import CardProgress, ContentBlock, Conversation, Message  # noqa: E402
+from src.core.config import AGENT_LLM_BACKEND  # noqa: E402
+from src.core.database import async_engine, engine, get_db_context  # noqa: E402
+from src.core.security import create_access_token  # noqa: E402
+from src.main import app  # noqa: E402
+from src.user.db_model import User  # noqa: E402
+
+# One of each path through the agent: plain text, generated session, manual lookup
+MESSAGES = (
+    "Why does my topspin forehand keep landing short?",
+    "Can you make me a practice session for my forehand?",
+    "How do I connect the PongBot app over bluetooth?",
+)
+# Events that put something on the player's screen
+FIRST_TOKEN_EVENTS = {"text_delta", "tool_use_start", "plan_ready", "drill_ready"}
+
+
+@dataclass
+class TurnResult:
+    message: str
+    ttft: float | None = None
+    total: float | None = None
+    events: int = 0
+    error: str | None = None
+
+
+@dataclass
+class QueryCounter:
+    count: int = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@dataclass
+class LoopLagMonitor:
+    interval: float = 0.01
+    samples: list[float] = field(default_factory=list)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+async def run_turn(
+    client: httpx.AsyncClient, message: str, conversation_id: str | None
+) -> tuple[TurnResult, str | None]:
+    result = TurnResult(message=message)
+    started = time.perf_counter()
+    body = {"message": message, "conversation_id": conversation_id}
+    try:
+        async with client.stream("POST", "/api/v1/agent/chat", json=body) as response:
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+                return result, conversation_id
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = json.loads(line[6:])
+                result.events += 1
+                conversation_id = data.get("conversation_id", conversation_id)
+                if result.ttft is None and data["type"] in FIRST_TOKEN_EVENTS:
+                    result.ttft = time.perf_counter() - started
+                if data["type"] == "error":
+                    result.error = data.get("code", "error")
+                elif data["type"] == "done":
+                    result.total = time.perf_counter() - started
+    except httpx.HTTPError as e:
+        result.error = type(e).__name__
+    return result, conversation_id
+
+
+async def run_client(base_url: str, token: str, turns: int, offset: int) -> list[TurnResult]:
+    results = []
+    conversation_id = None
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=600) as client:
+        for turn in range(turns):
+            message = MESSAGES[(offset + turn) % len(MESSAGES)]
+            result, conversation_id = await run_turn(client, message, conversation_id)
+            results.append(result)
+    return results
+
+
+def create_users(count: int) -> list[tuple[str, str]]:
+    users = []
+    with get_db_context() as db:
+        for _ in range(count):
+            user_id = str(uuid.uuid4())
+            db.add(User(id=user_id, email=f"bench-{user_id}@play8.invalid", name="Bench"))
+            users.append((user_id, create_access_token({"sub": user_id})))
+        db.commit()
+    return users
+
+
+def cleanup(user_ids: list[str]) -> None:
+    with get_db_context() as db:
+        conversation_ids = [
+            c.id for c in db.query(Conversation).filter(Conversation.user_id.in_(user_ids))
+        ]
+        message_ids = [
+            m.id for m in db.query(Message).filter(Message.conversation_id.in_(conversation_ids))
+        ]
+        block_ids = [
+            b.id for b in db.query(ContentBlock).filter(ContentBlock.message_id.in_(message_ids))
+        ]
+        db.query(CardProgress).filter(CardProgress.content_block_id.in_(block_ids)).delete()
+        db.query(ContentBlock).filter(ContentBlock.id.in_(block_ids)).delete()
+        db.query(Message).filter(Message.id.in_(message_ids)).delete()
+        db.query(Conversation).filter(Conversation.id.in_(conversation_ids)).delete()
+        db.query(User).filter(User.id.in_(user_ids)).delete()
+        db.commit()
+
+
+def report(label: str, results: list[TurnResult], elapsed: float, queries: int) -> None:
+    ok = [r for r in results if r.error is None and r.total is not None]
+    ttfts = [r.ttft for r in ok if r.ttft is not None]
+    totals = [r.total for r in ok]
+    print(f"\n{label}: {len(results)} turns in {elapsed:.1f}s ({len(results) / elapsed:.1f} turns/s)")
+    print(f"  errors:        {len(results) - len(ok)}")
+    for error in sorted({r.error for r in results if r.error}):
+        print(f"    {error}: {sum(r.error == error for r in results)}")
+    print(f"  TTFT     p50 {percentile(ttfts, 50) * 1000:8.0f} ms  p99 {percentile(ttfts, 99) * 1000:8.0f} ms")
+    print(f"  total    p50 {percentile(totals, 50) * 1000:8.0f} ms  p99 {percentile(totals, 99) * 1000:8.0f} ms")
+    print(f"  DB queries per turn: {queries / max(len(results), 1):.1f}")
+
+
+async def bench(args) -> None:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        if server_task.done():
+            server_task.result()
+            return
+        await asyncio.sleep(0.05)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    users = create_users(args.clients)
+    monitor = LoopLagMonitor()
+    try:
+        # One turn of each kind alone: exact query counts and unloaded latency
+        _, token = users[0]
+        print("Unloaded turns:")
+        for offset in range(len(MESSAGES)):
+            before = counter.count
+            [result] = await run_client(base_url, token, 1, offset)
+            print(
+                f"  {result.message[:48]:<50} ttft {(result.ttft or 0) * 1000:6.0f} ms  "
+                f"total {(result.total or 0) * 1000:6.0f} ms  "
+                f"{counter.count - before} queries  {result.error or ''}"
+            )
+
+        counter.count = 0
+        monitor_task = asyncio.create_task(monitor.run())
+        started = time.perf_counter()
+        batches = await asyncio.gather(
+            *(
+                run_client(base_url, token, args.turns, offset)
+                for offset, (_, token) in enumerate(users)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        monitor_task.cancel()
+
+        results = [result for batch in batches for result in batch]
+        report(f"{args.clients} clients x {args.turns} turns", results, elapsed, counter.count)
+        lags = monitor.samples
+        print(
+            f"  loop lag p50 {percentile(lags, 50) * 1000:8.1f} ms  "
+            f"p99 {percentile(lags, 99) * 1000:8.1f} ms  max {max(lags, default=0) * 1000:.1f} ms"
+        )
+        print("  (clients share the server's event loop, so lag includes client-side work)")
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+        server.should_exit = True
+        await server_task
+        cleanup([user_id for user_id, _ in users])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent SSE clients")
+    parser.add_argument("--turns", type=int, default=3, help="Sequential turns per client")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if AGENT_LLM_BACKEND != "fake":
+        print(f"⚠️  Using the {AGENT_LLM_BACKEND} backend: this spends real LLM credit")
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark: loading a conversation must take a constant number of queries.
+
+Seeds throwaway conversations of different lengths (every assistant message has a text
+block and a drill card, half of the cards with progress), loads each through
+AgentService.get_conversation_with_messages and fails if the query count grows with
+the number of messages. All seeded rows are removed afterwards.
+
+Usage:
+    poetry run python scripts/bench_conversation_queries.py [--sizes 10 100 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+import src.main  # noqa: E402, F401  (registers every model)
+from src.agent.db_model import CardProgress, ContentBlock, Conversation, Message  # noqa: E402
+from src.agent.service import AgentService  # noqa: E402
+from src.core.database import engine, get_db_context  # noqa: E402
+from src.user.db_model import User  # noqa: E402
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed_conversation(db, user_id: str, turns: int) -> str:
+    conversation = Conversation(user_id=user_id, title=f"bench {turns}")
+    db.add(conversation)
+    db.flush()
+    for turn in range(turns):
+        db.add(Message(conversation_id=conversation.id, role="user", content=f"question {turn}"))
+        reply = Message(conversation_id=conversation.id, role="assistant", content="answer")
+        db.add(reply)
+        db.flush()
+        db.add(ContentBlock(message_id=reply.id, type="text", content="answer", order=0))
+        card = ContentBlock(
+            message_id=reply.id,
+            type="tool_use",
+            content="{}",
+            tool_name="generate_training_session",
+            order=1,
+        )
+        db.add(card)
+        db.flush()
+        if turn % 2 == 0:
+            db.add(CardProgress(content_block_id=card.id, user_id=user_id, checked_steps="[true]"))
+    db.commit()
+    return conversation.id
+
+
+def cleanup(db, user_id: str) -> None:
+    conversation_ids = [c.id for c in db.query(Conversation).filter(Conversation.user_id == user_id)]
+    message_ids = [
+        m.id for m in db.query(Message).filter(Message.conversation_id.in_(conversation_ids))
+    ]
+    block_ids = [b.id for b in db.query(ContentBlock).filter(ContentBlock.message_id.in_(message_ids))]
+    db.query(CardProgress).filter(CardProgress.content_block_id.in_(block_ids)).delete()
+    db.query(ContentBlock).filter(ContentBlock.id.in_(block_ids)).delete()
+    db.query(Message).filter(Message.id.in_(message_ids)).delete()
+    db.query(Conversation).filter(Conversation.id.in_(conversation_ids)).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    with get_db_context() as db:
+        db.add(User(id=user_id, email=f"bench-{user_id}@play8.invalid", name="Bench"))
+        db.commit()
+        try:
+            query_counts = {}
+            for turns in args.sizes:
+                conversation_id = seed_conversation(db, user_id, turns)
+                db.expire_all()
+
+                counter = QueryCounter()
+                event.listen(engine, "before_cursor_execute", counter)
+                started = time.perf_counter()
+                detail = AgentService(db).get_conversation_with_messages(conversation_id, user_id)
+                elapsed = time.perf_counter() - started
+                event.remove(engine, "before_cursor_execute", counter)
+
+                query_counts[turns] = counter.count
+                print(
+                    f"{turns:>5} turns ({len(detail.messages):>5} messages): "
+                    f"{counter.count} queries, {elapsed * 1000:.1f} ms"
+                )
+        finally:
+            cleanup(db, user_id)
+
+    if len(set(query_counts.values())) != 1:
+        print(f"❌ Query count grows with conversation length: {query_counts}")
+        sys.exit(1)
+    print("✓ Constant query count")
+
+
+if __name__ == "__main__":
+    main()
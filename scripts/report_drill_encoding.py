@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Measure the token reduction of the compact drill encoding on stored conversations.
+
+Re-encodes the most recent generated sessions (generate_training_session cards) and
+user-edited drill messages from the database, checks that each one decodes back to the
+identical Pydantic models and reports JSON vs compact token counts.
+
+Usage:
+    poetry run python scripts/report_drill_encoding.py [--limit 500]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import ValidationError  # noqa: E402
+
+import src.main  # noqa: E402, F401  (registers every model)
+from src.agent.db_model import ContentBlock, Message  # noqa: E402
+from src.agent.drill_codec import (  # noqa: E402
+    compact_drills_in_text,
+    decode_session,
+    encode_session,
+)
+from src.agent.tokens import count_tokens  # noqa: E402
+from src.agent.tools import TrainingSession, generate_training_session  # noqa: E402
+from src.core.database import get_db_context  # noqa: E402
+
+
+def report(label: str, pairs: list[tuple[int, int]]) -> None:
+    if not pairs:
+        print(f"{label:<22} none found")
+        return
+    before = sum(json_tokens for json_tokens, _ in pairs)
+    after = sum(compact_tokens for _, compact_tokens in pairs)
+    print(
+        f"{label:<22}{len(pairs):>6} {before / len(pairs):>10.0f} {after / len(pairs):>10.0f} "
+        f"{100 * (before - after) / before:>9.1f}%"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--limit", type=int, default=500, help="Most recent rows of each kind")
+    args = parser.parse_args()
+
+    sessions, edits = [], []
+    failures = 0
+    with get_db_context() as db:
+        blocks = (
+            db.query(ContentBlock)
+            .filter(ContentBlock.tool_name == generate_training_session.name)
+            .order_by(ContentBlock.created_at.desc())
+            .limit(args.limit)
+        )
+        for block in blocks:
+            try:
+                session = TrainingSession.model_validate_json(block.content)
+            except ValidationError:
+                failures += 1
+                continue
+            encoded = encode_session(session)
+            if decode_session(encoded) != session:
+                print(f"❌ Round trip changed content block {block.id}")
+                failures += 1
+                continue
+            sessions.append((count_tokens(block.content), count_tokens(encoded)))
+
+        messages = (
+            db.query(Message)
+            .filter(Message.role == "user", Message.content.contains("ball_sequence"))
+            .order_by(Message.created_at.desc())
+            .limit(args.limit)
+        )
+        for message in messages:
+            compact = compact_drills_in_text(message.content)
+            if compact != message.content:
+                edits.append((count_tokens(message.content), count_tokens(compact)))
+
+    print(f"{'':<22}{'count':>6} {'json avg':>10} {'compact':>10} {'saved':>10}")
+    report("Generated sessions", sessions)
+    report("User-edited drills", edits)
+    if failures:
+        print(f"\n{failures} stored sessions could not be re-encoded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Report the system prompt size sent for each chat intent and the savings against the full prompt.
+
+Optionally classifies sample messages (one per line in a text file) to estimate the
+average saving for a real traffic mix.
+
+Usage:
+    poetry run python scripts/report_prompt_sizes.py [--messages sample_messages.txt]
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent.prompts import (  # noqa: E402
+    CORE_PROMPT,
+    INTENT_SECTIONS,
+    build_system_prompt,
+    classify_intent,
+    prompt_tokens_saved,
+)
+from src.agent.tokens import count_tokens  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", help="File with one sample user message per line")
+    args = parser.parse_args()
+
+    full_tokens = count_tokens(build_system_prompt())
+    print(f"{'Full prompt:':<20}{full_tokens:>6} tokens")
+    print(f"{'Shared core prefix:':<20}{count_tokens(CORE_PROMPT):>6} tokens\n")
+    print(f"{'intent':<12} {'tokens':>7} {'saved':>7} {'saved %':>8}")
+    for intent in INTENT_SECTIONS:
+        tokens = count_tokens(build_system_prompt(intent))
+        saved = prompt_tokens_saved(intent)
+        print(f"{intent:<12} {tokens:>7} {saved:>7} {saved / full_tokens:>8.0%}")
+
+    if args.messages:
+        with open(args.messages) as f:
+            messages = [line.strip() for line in f if line.strip()]
+        intents = Counter(classify_intent(m) for m in messages)
+        total_saved = sum(prompt_tokens_saved(i) * n for i, n in intents.items())
+        print(f"\n{len(messages)} sample messages: {dict(intents)}")
+        print(f"Average saving: {total_saved / len(messages):.0f} tokens per first LLM call")
+
+
+if __name__ == "__main__":
+    main()
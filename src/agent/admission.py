@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import time
+from collections import Counter as TallyCounter
+
+from src.core.config import (
+    AGENT_MAX_CONCURRENT_STREAMS,
+    AGENT_MAX_QUEUED_STREAMS,
+    AGENT_MAX_STREAMS_PER_USER,
+    AGENT_QUEUE_RETRY_AFTER_SECONDS,
+)
+from src.core.metrics import Counter, Gauge, Histogram
+
+QUEUE_DEPTH = Gauge("agent_stream_queue_depth", "Chat streams waiting for an LLM slot")
+ACTIVE_STREAMS = Gauge("agent_streams_active", "Chat streams holding an LLM slot")
+QUEUE_WAIT_SECONDS = Histogram(
+    "agent_stream_queue_wait_seconds", "Time chat streams waited for an LLM slot"
+)
+REJECTED_STREAMS = Counter(
+    "agent_streams_rejected_total", "Chat streams turned away by admission control",
+    labelnames=("reason",),
+)
+
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, reason: str, retry_after: int = AGENT_QUEUE_RETRY_AFTER_SECONDS):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A chat stream's place in the admission queue; release it when the stream ends."""
+
+    def __init__(self, controller: "AdmissionController", user_id: str):
+        self.controller = controller
+        self.user_id = user_id
+        self.enqueued_at = time.monotonic()
+        self.released = False
+        self._admitted = asyncio.Event()
+
+    @property
+    def admitted(self) -> bool:
+        return self._admitted.is_set()
+
+    @property
+    def position(self) -> int:
+        return self.controller.position(self)
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a slot; returns whether the ticket is admitted."""
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._admitted.wait(), timeout)
+        return self.admitted
+
+    def release(self) -> None:
+        self.controller.release(self)
+
+
+class AdmissionController:
+    """Per-process limit on concurrent LLM streams with a bounded, fair wait queue.
+
+    When a slot frees up it goes to the waiting user with the fewest active streams,
+    so one user opening many chats can't starve everyone else.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = AGENT_MAX_CONCURRENT_STREAMS,
+        max_queued: int = AGENT_MAX_QUEUED_STREAMS,
+        max_per_user: int = AGENT_MAX_STREAMS_PER_USER,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.active = 0
+        self._waiting: list[Ticket] = []
+        self._active_by_user: TallyCounter[str] = TallyCounter()
+        self._tickets_by_user: TallyCounter[str] = TallyCounter()
+
+    def enqueue(self, user_id: str) -> Ticket:
+        """Take a place in line, or raise AdmissionRejectedError if the stream can't be served."""
+        if self.max_per_user and self._tickets_by_user[user_id] >= self.max_per_user:
+            REJECTED_STREAMS.inc(reason="per_user")
+            raise AdmissionRejectedError("Too many concurrent chats for this user")
+        if self.active >= self.max_concurrent and len(self._waiting) >= self.max_queued:
+            REJECTED_STREAMS.inc(reason="queue_full")
+            raise AdmissionRejectedError("The coach is busy right now, please try again shortly")
+
+        ticket = Ticket(self, user_id)
+        self._tickets_by_user[user_id] += 1
+        self._waiting.append(ticket)
+        self._dispatch()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        if ticket.admitted or ticket not in self._waiting:
+            return 0
+        return self._waiting.index(ticket) + 1
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.admitted:
+            self.active -= 1
+            self._active_by_user[ticket.user_id] -= 1
+        else:
+            self._waiting.remove(ticket)
+        self._tickets_by_user[ticket.user_id] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.active < self.max_concurrent and self._waiting:
+            # min() is stable, so ties go to whoever has waited longest
+            ticket = min(self._waiting, key=lambda t: self._active_by_user[t.user_id])
+            self._waiting.remove(ticket)
+            self.active += 1
+            self._active_by_user[ticket.user_id] += 1
+            QUEUE_WAIT_SECONDS.observe(time.monotonic() - ticket.enqueued_at)
+            ticket._admitted.set()
+        QUEUE_DEPTH.set(len(self._waiting))
+        ACTIVE_STREAMS.set(self.active)
+
+
+admission = AdmissionController()
+
+
+def admit_turn(user_id: str) -> Ticket:
+    """Take a place in line for a new chat turn, before any other work is done for it.
+
+    Fails fast with AdmissionRejectedError when the worker is saturated (or the user is at
+    their stream limit) instead of degrading every stream; each transport turns that into
+    its own rejection, an HTTP 429 or a WebSocket error frame.
+    """
+    return admission.enqueue(user_id)
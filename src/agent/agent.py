@@ -1,335 +1,311 @@
-import os
+import json
+import time
+import uuid
 from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
 
+import httpx
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.ai import AIMessageChunk
 
 from src.agent.ai_completion import AICompletion
-from src.agent.tools import generate_training_session
+from src.agent.drill_codec import compact_drills_in_text, compact_session_result
+from src.agent.drill_engine import DrillIntent, build_session, describe_session, extract_intent
+from src.agent.drill_repair import record_repairs, repair_session
+from src.agent.prefetch import ManualPrefetch
+from src.agent.prompts import MANUAL, classify_intent, select_system_prompt
+from src.agent.routing import FAST, Route, route_turn
+from src.agent.telemetry import TurnStats
+from src.agent.tool_executor import ToolExecutor
+from src.agent.tools import (
+    TrainingSessionStream,
+    generate_training_session,
+    summarize_training_session,
+)
+from src.core.config import (
+    AGENT_COMPACT_TOOL_RESULTS,
+    AGENT_LOCAL_DRILL_ENGINE,
+    AGENT_MANUAL_PREFETCH,
+    AGENT_MAX_TOOL_STEPS,
+    AGENT_SKIP_GENERATOR_FOLLOWUP,
+    AGENT_TURN_TIME_BUDGET_SECONDS,
+    AGENT_TURN_TOKEN_BUDGET,
+    OPENAI_FAST_MODEL,
+    OPENAI_MODEL,
+)
+from src.core.metrics import Counter
 from src.manual.tool import search_pongbot_manual
 
-SYSTEM_PROMPT = """
-You are Play8 AI Coach 🎾, a professional and energetic tennis and padel coach specialized in training with PongBot Pace S Series ball machines.
-
-Your role is to motivate players and help them improve their skills through structured, effective training sessions using precise ball machine configurations.
-
-## Core Expertise
-
-### Sports Knowledge
-- Tennis and Padel technique, drills, and training principles
-- Court geometry and tactical positioning
-- Ball trajectories and match patterns
-- Progressive coaching methods
-
-### Ball Machine Mastery
-- Expert at configuring PongBot Pace S Series ball machines
-- Deep understanding of parameter tuning for optimal training
-- Ability to design realistic ball sequences that simulate match scenarios
-- Knowledge of machine placement strategies
-
-### Player Understanding
-- Understanding pain points: inconsistency, footwork, timing, spin control, backhand/forehand development
-- Creating engaging, achievable training programs adapted to skill level
-- Designing drills that translate to real match performance
-
-## Technical Knowledge
-
-### Supported Sports
-- Tennis (full court, baseline training, net play)
-- Padel (wall play, glass defense, net transitions)
-
-### Court Dimensions & Geometry
-
-**IMPORTANT - You can SEE the court:**
-When designing drills, visualize the actual court layout as if you're looking at the CourtDiagram shown to players. You can see exactly where each ball lands based on the drop_point and depth coordinates.
-
-Tennis Court:
-- Total Length: 23.77m, Singles Width: 8.23m, Doubles Width: 10.97m
-- Service Line: 6.40m from net, Net Height: 0.91m (center), 1.07m (posts)
-- Service Box Dimensions: 6.40m (depth) × 4.115m (width per box)
-
-Padel Court:
-- Length: 20m, Width: 10m
-- Service Line: 6.95m, Net Height: 0.88m (center)
-- Service Box Dimensions: 6.95m (depth) × 5m (width per box)
-
-### Legal Serving Areas - Coordinate Mapping
-
-**Tennis Service Boxes (visualize these on the court diagram):**
-- **Drop Point Range**: -4 to +4 (service boxes span center court area)
-  - Left Service Box (Ad Court): drop_point = -4 to 0
-  - Right Service Box (Deuce Court): drop_point = 0 to +4
-  - Outside service boxes (±5 to ±10): Valid for groundstroke drills, but NOT legal serves
-- **Depth Range**: 1 to 10 (from net to service line)
-  - 0-1: Too close to net (potential net ball)
-  - 1-10: Legal service box depth
-  - 11-20: Behind service line (fault if serving, but legal for baseline drills)
-
-**Padel Service Boxes:**
-- **Drop Point Range**: -4 to +4 (service boxes span center court area)
-  - Left Service Box: drop_point = -4 to 0
-  - Right Service Box: drop_point = 0 to +4
-  - Outside service boxes (±5 to ±10): Valid for groundstroke drills, but NOT legal serves
-- **Depth Range**: 1 to 11 (from net to service line)
-  - 0-1: Too close to net
-  - 1-11: Legal service box depth
-  - 12-20: Behind service line (fault if serving)
-
-### Court Geometry Validation Rules
-
-**CRITICAL - Avoid Training Fouls:**
-When designing ANY drill (not just serve practice), be mindful of legal serving areas to avoid reinforcing bad habits:
-
-1. **For serve-focused drills**: MUST use parameters within ONE service box (choose either left OR right, not both)
-   - ✅ CORRECT: "Deuce Court Serve" → drop_point: 0 to +4, depth: 5-9 (right box only)
-   - ✅ CORRECT: "Ad Court Serve" → drop_point: -4 to 0, depth: 5-9 (left box only)
-   - ❌ NEVER: drop_point: -3 to +3 (crosses both boxes - unrealistic serve pattern)
-   - ❌ NEVER: drop_point: +8, depth: 14 (far outside service box = trains faults)
-   - **IMPORTANT**: In a single serve drill, ALL balls must target the SAME service box
-     - If ball 1 has drop_point = +2 (deuce court), then ball 2, 3, 4... must also be in deuce court (0 to +4)
-     - Do NOT mix: ball 1 at +2, ball 2 at -2 (this crosses service boxes)
-
-2. **For baseline/groundstroke drills**: Can use wider coordinates and cross both sides, but explain the context
-   - Example: "Crosscourt Rally" → drop_point: -6 to +6, depth: 10-14 (legal groundstrokes)
-   - ✅ Always mention: "This is a rally drill, not serve practice"
-
-3. **Visual validation**: Before finalizing parameters, visualize the ball landing on the court diagram
-   - Ask yourself: "If this were a serve, would it be legal?"
-   - For serve drills: "Are all balls landing in the SAME service box?"
-   - If NO and it's supposed to be serve practice → adjust parameters
-   - If NO but it's groundstroke practice → explicitly note this in focus_points
-
-4. **Parameter bounds for legal serves**:
-   - Tennis Deuce Court (Right): drop_point ∈ [0, +4], depth ∈ [1, 10]
-   - Tennis Ad Court (Left): drop_point ∈ [-4, 0], depth ∈ [1, 10]
-   - Padel Deuce Court (Right): drop_point ∈ [0, +4], depth ∈ [1, 11]
-   - Padel Ad Court (Left): drop_point ∈ [-4, 0], depth ∈ [1, 11]
-   - **Choose ONE box per serve drill, not both**
-   - Groundstrokes: Can use full range, but explain tactical purpose
-
-**Educational Notes in Drills:**
-When you design drills that place balls outside service boxes (e.g., wide shots, deep shots), include in your text response:
-- "Note: These placements are for groundstroke training, not serve practice"
-- "In a match, you'd receive these as rally balls, not serves"
-- This prevents players from developing unrealistic expectations
-
-### Ball Machine Parameters (PongBot Pace S Series)
-
-**CRITICAL - Understanding Real-World Ball Machine Operation**:
-
-When a player executes a drill in real life:
-1. The ball machine is loaded with 50-100 balls and placed at ONE position (e.g., "Baseline Center")
-2. The player starts the drill and the machine serves balls following your 6-ball configuration sequence
-3. **The sequence repeats cyclically**: Ball 1 → Ball 2 → Ball 3 → Ball 4 → Ball 5 → Ball 6 → Ball 1 → Ball 2...
-   (Default mode is sequential cycle; machine can also do random order, but you should design for sequential)
-4. This continues until the drill duration ends (e.g., 5 minutes) or the machine runs out of balls
-
-**Your Job**: Design a meaningful 6-ball sequence that creates realistic rally patterns or tactical progressions.
-
-**Design Philosophy**:
-- **Usually varied**: Most drills should have varied ball placements to simulate match-like situations
-  - Example: Ball 1 to forehand corner, Ball 2 to backhand corner, Ball 3 to center (alternating rally pattern)
-  - Example: Ball 1 short, Ball 2 medium, Ball 3 deep, Ball 4 short... (depth variation for movement training)
-- **Sometimes same**: Consistency drills (especially for beginners) can repeat the same drop point
-  - Example: All 6 balls to backhand corner at depth 12 (pure backhand consistency training)
-- **Intelligent variation**: Choose variation strategy based on drill purpose:
-  - Alternating sides: Forehand ↔ Backhand rally simulation
-  - Depth variation: Short → Medium → Deep balls for court positioning
-  - Spin variation: Topspin, Underspin, No Spin for shot variety
-  - Tactical progressions: Wide → Middle → Attack (simulating point patterns)
-
-**Ball Sequence Requirement**:
-Every drill MUST have EXACTLY 6 balls in the sequence. No more, no less.
-
-**Parameters** (each of the 6 balls MUST have ALL 7 parameters - never omit any):
-1. ball_number (REQUIRED): 1, 2, 3, 4, 5, or 6
-2. spin_type (REQUIRED): "Topspin", "No Spin", "Underspin"
-3. spin_strength (REQUIRED, 0-10 integer): 0=flat, 1-3=light, 4-6=medium, 7-10=heavy
-4. speed (REQUIRED, 0-10 integer): 0-3=very slow, 3-5=rally, 5-7=advanced, 7-10=competition
-5. drop_point (REQUIRED, -10 to +10 integer): Horizontal landing (negative=left, positive=right, 0=center)
-   -10=extreme left, -6=backhand corner, 0=center, +6=forehand corner, +10=extreme right
-6. depth (REQUIRED, 0-20 integer): Front/back position
-   0-4=short, 5-8=mid court, 9-12=baseline rally, 13-16=deep, 17-20=very deep
-7. feed (REQUIRED, 0.8-5.0 float): Time between balls in seconds
-   0.8-1.2=reaction, 1.3-2.0=fast rally, 2.0-3.0=standard, 3.0-5.0=technique
-
-**CRITICAL**: When calling generate_training_session, EVERY ball in EVERY drill must include ALL 7 parameters above. Missing parameters will cause errors.
-
-### Player Levels
-- Beginner (1): Learning basic strokes
-- Intermediate (2): Rally consistency
-- Advanced (3): Competitive training
-- Elite (4): Match simulation
-
-### Parameter Formulas (Use as guidelines)
-- Speed: 2 + (level * 2) → Beginner=4, Intermediate=6, Advanced=8, Elite=10
-- Spin: level * 2 → Beginner=2, Intermediate=4, Advanced=6, Elite=8
-- Feed: 3.5 - (level * 0.5) → Beginner=3.0s, Intermediate=2.5s, Advanced=2.0s, Elite=1.5s
-- Depth: 8 + (level * 2) → Beginner=10, Intermediate=12, Advanced=14, Elite=16
-
-### Machine Placement (ONLY 3 POSITIONS ALLOWED)
-Tennis:
-  - "Baseline Center" (default, neutral position)
-  - "Baseline Left Corner" (for targeting right side of court)
-  - "Baseline Right Corner" (for targeting left side of court)
-Padel:
-  - "Center Back Glass" (default)
-  - "Left Back Glass"
-  - "Right Back Glass"
-
-**CRITICAL**: You MUST use EXACTLY these position names. No variations allowed.
-
-### Tactical Patterns
-Tennis: Cross-court rally (-6, +6), Inside-out forehand (-6 → +6), Backhand consistency (-6 repeated)
-Padel: Wall defense (-7), Net transition (-4, +4), Attack setup (+4, +7)
-
-## Communication Style
-
-- Motivating, enthusiastic, and encouraging like a real coach 💪
-- Use emojis naturally (🎾 🎯 ⚡ 🔥 💪 ⭐ 🚀 👍 etc.)
-- Professional yet friendly and approachable
-- Keep responses concise but impactful (2-4 sentences typically, expand with educational context when needed)
-- Celebrate progress and encourage consistent practice
-
-## CRITICAL - Response Structure for Training Sessions
-
-When generating training sessions:
-
-1. ALWAYS write a motivating text response FIRST (before cards appear)
-   - Acknowledge what they want to work on
-   - Build excitement about the session
-   - IMPORTANT: Include educational context (see below)
-
-2. THEN call generate_training_session to create drill cards
-
-### Educational Context (REQUIRED!)
-
-Your text response must explain the drill design logic:
-
-Always include:
-- WHY you designed the drill this way (tactical purpose, training goal)
-- WHAT the player should focus on (technique points, common mistakes)
-- HOW the drill progression works (why this sequence, why these parameters)
-- Connection to match scenarios (how this translates to real play)
-
-Example elements to mention:
-- Why you chose these drop points (e.g., "-6 and +6 simulate cross-court rally")
-- Why this speed/depth combo (e.g., "Speed 6 with depth 12 = realistic rally pace")
-- Why this ball sequence (e.g., "Alternating corners trains recovery footwork")
-- Expected benefits (short-term: "groove the motion", long-term: "automatic in matches")
-- Practice frequency (e.g., "3x per week for 2 weeks")
-- Focus points (e.g., "Keep split step timing sharp")
-
-Adapt depth based on user:
-- Beginners → More detailed explanation
-- Experienced players → Brief but insightful
-
-## Tool Usage
-
-Use generate_training_session: training sessions, workouts, practice routines, skill improvement
-Use search_pongbot_manual: PongBot settings, features, specs, troubleshooting, manual questions
-Text-only: casual chat, general technique, motivational questions
-
-## IMPORTANT - Never Mention Tools
-
-- NEVER say "I'll call the tool" or reference implementation
-- Just provide your response naturally—cards appear automatically
-- Speak like a real coach, not a software system
-
-## Response Examples
-
-Example 1 (Intermediate - cross-court forehand):
-User: "I want to improve my cross-court forehand consistency"
-Response: "Let's build that cross-court forehand into a weapon! 🎾🔥 I've designed a 30-minute progressive session that focuses on the exact pattern you'll use in matches. Here's the logic: I've created a 6-ball sequence that simulates a realistic cross-court rally. Ball 1 goes to your backhand (-6, depth 12), Ball 2 to your forehand (+6, depth 12), Ball 3 back to backhand (-6, depth 10), Ball 4 to forehand (+6, depth 14), Ball 5 to center (0, depth 12), Ball 6 wide forehand (+8, depth 11). This sequence repeats throughout the drill—so you'll hit 30-40 cycles of this 6-ball pattern in 5 minutes. Why this sequence? It trains your recovery footwork (getting back to center after each shot), challenges you with depth variation (10-14), and includes a center ball to work on inside-out forehands. The machine will cycle through these 6 balls continuously: 1→2→3→4→5→6→1→2... This is exactly how rallies flow in matches! Speed is set at 6 with medium topspin to match realistic rally pace. Focus: split-step timing and recovering to the T after every shot. Practice this 3x per week and you'll see that forehand become automatic. Let's go! 💪⭐"
-[Training cards appear]
-
-Example 2 (Beginner):
-User: "I'm a beginner, help me improve"
-Response: "Welcome to your tennis journey! 🎾✨ I've created a beginner-friendly 30-minute session that builds your foundation step by step. Here's how it works: We're starting with slower speeds (4) and consistent depths (10) to let you focus purely on technique without rushing. The first few drills use simple, predictable ball placements (centered or slightly to one side) so you can develop your swing path and contact point. Then we gradually introduce variety—this progression is key because your brain needs repetition before it can handle complexity. The feed intervals are set to 3 seconds, giving you time to reset and think about each shot. Focus on: watching the ball all the way to your racket, keeping a relaxed grip, and following through toward your target. You'll feel wobbly at first, but after 2-3 sessions, the motion will start clicking. Think of this as building muscle memory—repetition is your friend! Ready to get started? 💪🚀"
-[Training cards appear]
-
-Example 3 (Casual - text only):
-User: "What's the key to a good topspin forehand?"
-Response: "Great question! The key to a topspin forehand is the low-to-high swing path—imagine brushing up the back of the ball like you're wiping a window from bottom to top. Start with your racket below the ball, make contact at waist height, and finish high over your opposite shoulder. The racket speed creates the spin, not muscle tension, so stay relaxed! Practice this motion slowly first, then gradually add speed. Keep grinding! 💪🎾"
-[No training session]
+LOCAL_SESSIONS = Counter(
+    "agent_local_sessions_total",
+    "Training sessions answered by the rule-based drill engine instead of the LLM",
+    labelnames=("sport",),
+)
 
-## User-Edited Drills
+TOOL_LOOP_STOPS = Counter(
+    "agent_tool_loop_stops_total",
+    "Why the agent's tool loop ended (answered, generator_only, no_results or a budget)",
+    labelnames=("reason",),
+)
 
-Players can edit drill parameters using an interactive court editor. When a user sends you updated drill data, the message will contain a JSON object with the full drill card.
-
-**What to Expect:**
-- The user message will look like: "I've updated this drill with new settings:" followed by a JSON block
-- The JSON contains the complete drill card including title, drill_number, machine_position, ball_sequence (all 6 balls with their parameters), focus_points, etc.
-- The user changed one or more parameters (speed, spin, drop points, depth, feed interval, machine position, etc.)
+# Pure generator tools: their output is rendered for the player and the model has
+# already written its explanation before calling them
+GENERATOR_TOOLS = {
+    generate_training_session.name: summarize_training_session,
+}
 
-**Your Response:**
-1. **Acknowledge the specific changes**: Reference the drill by name and identify exactly what changed (e.g., "I see you've increased the speeds on Balls 3 and 4 from 6 to 8 in your 'Cross-Court Forehand Rally'!")
-2. **Analyze the changes**: Evaluate whether the edits align with their training goals
-   - Are the changes appropriate for their skill level?
-   - Do the new parameters create a better or more challenging training pattern?
-   - Any potential issues (e.g., speed too fast for the feed interval, drop points creating unrealistic patterns)?
-3. **Provide constructive feedback**:
-   - ✅ If changes are good: "That's a smart adjustment — the faster speeds will help you prepare for competitive rallies!"
-   - ⚠️ If changes need refinement: "Those drop points might be too wide apart for effective footwork training. Consider..."
-   - 💡 Suggest complementary adjustments: "Since you increased the speed, you might want to slightly increase the feed time to 2.5s for recovery."
-4. **Explain implications**: Help them understand how the changes affect their training
-   - "With Ball 3 now at depth 16, you'll be practicing deeper defensive shots — great for baseline rallies!"
-   - "Moving the machine to Left Corner means you'll work your forehand crosscourt more"
-5. **Offer next steps**: "Want me to generate a new session that builds on this adjusted drill?" or "Should I adjust the other drills to match this intensity?"
 
-**Key Principles:**
-- Be supportive and educational, never critical
-- Explain the tactical/technical implications of their changes
-- Help them understand cause-effect relationships in ball machine training
-- Suggest improvements without dismissing their ideas
-- Encourage experimentation: "That's an interesting variation — try it and see how it feels!"
+def build_title_completion(http_async_client: httpx.AsyncClient | None = None) -> AICompletion:
+    return AICompletion(
+        model=OPENAI_MODEL,
+        temperature=0.5,
+        max_tokens=20,
+        http_async_client=http_async_client,
+    )
 
-## Remember
 
-You're not just a tool—you're a coach who builds confidence and excitement! 🌟
+def build_summary_completion(http_async_client: httpx.AsyncClient | None = None) -> AICompletion:
+    return AICompletion(
+        model=OPENAI_MODEL,
+        temperature=0.3,
+        max_tokens=400,
+        http_async_client=http_async_client,
+    )
 
-Always explain the "why" behind your training designs, help players understand the logic, and make them feel motivated to practice!
-"""
+
+@dataclass
+class ModelStep:
+    """What one streamed completion produced: the merged response and card parsers."""
+
+    response: AIMessageChunk | None = None
+    session_streams: dict[str, TrainingSessionStream] = field(default_factory=dict)
 
 
 class Agent:
-    def __init__(self):
+    def __init__(
+        self,
+        http_async_client: httpx.AsyncClient | None = None,
+        title_completion: AICompletion | None = None,
+        summary_completion: AICompletion | None = None,
+    ):
         # Single LLM with tools bound
         self.completion = AICompletion(
             temperature=0.7,
+            http_async_client=http_async_client,
         )
+        self.title_completion = title_completion
+        self.summary_completion = summary_completion
         self.tools = [generate_training_session, search_pongbot_manual]
-        self.tool_map = {t.name: t for t in self.tools}
+        self.tool_executor = ToolExecutor(self.tools)
         self.completion.bind_tools(self.tools)
+        # Routed turns keep the tools, so a misrouted request still gets its session
+        self.fast_completion = None
+        if OPENAI_FAST_MODEL:
+            self.fast_completion = AICompletion(
+                model=OPENAI_FAST_MODEL,
+                temperature=0.7,
+                http_async_client=http_async_client,
+            )
+            self.fast_completion.bind_tools(self.tools)
+
+    def select_completion(
+        self, message: str, conversation_history: list[dict]
+    ) -> tuple[AICompletion, Route | None]:
+        """The completion that answers this turn, and the route that picked it if routing is on."""
+        if self.fast_completion is None:
+            return self.completion, None
+        route = route_turn(message, conversation_history)
+        return (self.fast_completion if route.name == FAST else self.completion), route
 
     def _build_messages(self, message: str, conversation_history: list[dict]) -> list:
-        messages = [SystemMessage(content=SYSTEM_PROMPT)]
+        # Only the sections the message needs; the follow-up call reuses the same
+        # system message so it hits the provider's prompt cache
+        messages = [SystemMessage(content=select_system_prompt(message))]
         for msg in conversation_history:
             role = msg.get("role", "user")
             content = msg.get("content", "")
-            if role == "user":
-                messages.append(HumanMessage(content=content))
+            if role == "summary":
+                messages.append(
+                    SystemMessage(content=f"Summary of the earlier conversation:\n{content}")
+                )
+            elif role == "user":
+                messages.append(HumanMessage(content=compact_drills_in_text(content)))
             elif role == "assistant":
                 messages.append(AIMessage(content=content))
-        messages.append(HumanMessage(content=message))
+        # Edited drills arrive as JSON; the model gets the tabular encoding
+        messages.append(HumanMessage(content=compact_drills_in_text(message)))
         return messages
 
+    async def _run_local_session(self, intent: DrillIntent) -> AsyncGenerator[dict, None]:
+        """Answer a fully specified session request without calling the LLM."""
+        session = build_session(intent)
+        tool_call_id = f"local_{uuid.uuid4().hex}"
+        LOCAL_SESSIONS.inc(sport=intent.sport)
+
+        yield {"type": "text_delta", "content": describe_session(intent, session)}
+        yield {"type": "tool_use_start", "id": tool_call_id, "tool": generate_training_session.name}
+        yield {"type": "plan_ready", "plan": session.plan.model_dump()}
+        for index, drill in enumerate(session.drills):
+            yield {"type": "drill_ready", "index": index, "drill": drill.model_dump()}
+        yield {
+            "type": "tool_use_end",
+            "id": tool_call_id,
+            "tool": generate_training_session.name,
+            "result": json.dumps(session.model_dump()),
+            "is_error": False,
+        }
+
     async def run(
-        self, message: str, conversation_history: list[dict]
+        self,
+        message: str,
+        conversation_history: list[dict],
+        stats: TurnStats | None = None,
     ) -> AsyncGenerator[dict, None]:
+        stats = stats if stats is not None else TurnStats()
+
+        # Fast path: common, fully specified requests don't need the model
+        intent = extract_intent(message, conversation_history) if AGENT_LOCAL_DRILL_ENGINE else None
+        if intent:
+            stats.model = "local"
+            stats.mark_first_token()
+            async for event in self._run_local_session(intent):
+                yield event
+            return
+
+        prefetch = None
+        if AGENT_MANUAL_PREFETCH and classify_intent(message) == MANUAL:
+            # Embedding and vector search overlap with the model deciding to call the tool
+            prefetch = ManualPrefetch(message)
+        try:
+            async for event in self._run_model(message, conversation_history, stats, prefetch):
+                yield event
+        finally:
+            if prefetch is not None:
+                prefetch.close()
+
+    async def _run_model(
+        self,
+        message: str,
+        conversation_history: list[dict],
+        stats: TurnStats,
+        prefetch: ManualPrefetch | None,
+    ) -> AsyncGenerator[dict, None]:
+        completion, route = self.select_completion(message, conversation_history)
+        if route is not None:
+            stats.route, stats.route_reason = route.name, route.reason
+        stats.model = completion.model
+
         messages = self._build_messages(message, conversation_history)
 
-        # Single streaming call - LLM decides to use tools or not
-        full_response = None
+        # Each step streams one completion and runs the tool calls it made; the loop
+        # ends when the model answers without tools or a budget runs out
+        tool_steps = 0
+        stop_reason = None
+        while True:
+            step = ModelStep()
+            async for event in self._stream_step(
+                completion, messages, stats, step, allow_tools=stop_reason is None
+            ):
+                yield event
+            response = step.response
+            if stop_reason is not None or not (response and response.tool_calls):
+                TOOL_LOOP_STOPS.inc(reason=stop_reason or "answered")
+                return
+            tool_steps += 1
+
+            for tool_call in response.tool_calls:
+                stream = step.session_streams.get(tool_call["id"])
+                if stream:
+                    stream.apply_to_args(tool_call["args"])
+                # Fix rule violations locally rather than failing validation and re-prompting
+                session = tool_call["args"].get("session")
+                if tool_call["name"] == generate_training_session.name and isinstance(session, dict):
+                    record_repairs(repair_session(session))
+
+            # Manual searches close enough to the message take the prefetched chunks
+            prefetched = {}
+            if prefetch is not None:
+                for tool_call in response.tool_calls:
+                    query = tool_call["args"].get("query", "")
+                    if tool_call["name"] == search_pongbot_manual.name and prefetch.claim(query):
+                        prefetched[tool_call["id"]] = prefetch.result(query)
+
+            # Execute tool calls concurrently, emitting results in call order
+            tool_messages = []
+            needs_followup = False
+            with stats.span("tools"):
+                async for result in self.tool_executor.execute_all(response.tool_calls, prefetched):
+                    yield {
+                        "type": "tool_use_end",
+                        "id": result.id,
+                        "tool": result.name,
+                        "result": result.content,
+                        "is_error": result.is_error,
+                    }
+
+                    content = result.content
+                    compact = GENERATOR_TOOLS.get(result.name)
+                    if compact is None or result.is_error:
+                        needs_followup = True
+                    elif AGENT_COMPACT_TOOL_RESULTS:
+                        content = compact(result.content)
+                    else:
+                        # The full session, as a table rather than JSON
+                        content = compact_session_result(result.content)
+
+                    # Create ToolMessage for next LLM call
+                    tool_messages.append(
+                        ToolMessage(
+                            content=content,
+                            tool_call_id=result.id,
+                        )
+                    )
+
+            # The prompt asks for the explanation before the tool call; only skip the
+            # follow-up when the model actually wrote it
+            if AGENT_SKIP_GENERATOR_FOLLOWUP and not needs_followup and response.content:
+                TOOL_LOOP_STOPS.inc(reason="generator_only")
+                return
+            if not tool_messages:
+                TOOL_LOOP_STOPS.inc(reason="no_results")
+                return
+
+            # Add assistant message with tool calls and tool results to history
+            messages.append(response)
+            messages.extend(tool_messages)
+
+            # Out of budget: one last completion that has to answer with what it has
+            if tool_steps >= AGENT_MAX_TOOL_STEPS:
+                stop_reason = "max_steps"
+            elif stats.prompt_tokens + stats.completion_tokens >= AGENT_TURN_TOKEN_BUDGET:
+                stop_reason = "token_budget"
+            elif time.perf_counter() - stats.started_at >= AGENT_TURN_TIME_BUDGET_SECONDS:
+                stop_reason = "time_budget"
+
+    async def _stream_step(
+        self,
+        completion: AICompletion,
+        messages: list,
+        stats: TurnStats,
+        step: ModelStep,
+        allow_tools: bool = True,
+    ) -> AsyncGenerator[dict, None]:
+        """Stream one completion as text deltas, tool call starts and drill cards."""
         tool_call_started = False
         detected_tool_name = None
+        # Streamed tool calls by chunk index
+        tool_call_heads: dict[int, dict] = {}
 
-        async for chunk in self.completion.get_stream_response(messages):
+        stats.llm_calls += 1
+        async for chunk in completion.get_stream_response(messages, allow_tools=allow_tools):
             # Accumulate full response for tool calls
-            full_response = chunk if full_response is None else full_response + chunk
+            step.response = chunk if step.response is None else step.response + chunk
+            stats.add_usage(chunk.usage_metadata)
 
             # Check if this chunk contains tool call data
             tool_call_chunks = getattr(chunk, "tool_call_chunks", None)
             if tool_call_chunks and len(tool_call_chunks) > 0:
+                stats.mark_first_token()
                 # First tool call chunk detected - emit start event immediately
                 if not tool_call_started:
                     tool_call_started = True
@@ -342,57 +318,30 @@ class Agent:
                         "id": "pending",
                         "tool": detected_tool_name or "unknown",
                     }
+
+                # Emit drill cards as soon as each one is fully streamed
+                for tool_chunk in tool_call_chunks:
+                    index = tool_chunk.get("index") or 0
+                    if tool_chunk.get("name"):
+                        tool_call_heads[index] = tool_chunk
+                    head = tool_call_heads.get(index)
+                    if not head or head["name"] != generate_training_session.name:
+                        continue
+                    stream = step.session_streams.setdefault(head["id"], TrainingSessionStream())
+                    for card_event in stream.feed(tool_chunk.get("args") or ""):
+                        yield card_event
                 # Don't stream tool call content as text
                 continue
 
             # Stream text content as it arrives
             if chunk.content:
+                stats.mark_first_token()
                 yield {"type": "text_delta", "content": chunk.content}
 
-        # After streaming completes, execute any tool calls
-        if full_response and full_response.tool_calls:
-            tool_messages = []
-
-            for tool_call in full_response.tool_calls:
-                tool_fn = self.tool_map.get(tool_call["name"])
-                if tool_fn:
-                    # Execute tool
-                    result = tool_fn.invoke(tool_call["args"])
-
-                    # Emit tool_use_end after execution
-                    yield {
-                        "type": "tool_use_end",
-                        "id": tool_call["id"],
-                        "tool": tool_call["name"],
-                        "result": result,
-                    }
-
-                    # Create ToolMessage for next LLM call
-                    tool_messages.append(
-                        ToolMessage(
-                            content=result,
-                            tool_call_id=tool_call["id"],
-                        )
-                    )
-
-            # If we executed tools, make another LLM call to process results
-            if tool_messages:
-                # Add assistant message with tool calls and tool results to history
-                messages.append(full_response)
-                messages.extend(tool_messages)
-
-                async for chunk in self.completion.get_stream_response(messages):
-                    if chunk.content:
-                        yield {"type": "text_delta", "content": chunk.content}
-
     async def generate_title(self, message: str) -> str:
         """Generate a short conversation title from the first user message."""
         try:
-            title_llm = AICompletion(
-                model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                temperature=0.5,
-                max_tokens=20,
-            )
+            title_llm = self.title_completion or build_title_completion()
             messages = [
                 SystemMessage(
                     content="Generate a short title (max 6 words) for a conversation. Reply with ONLY the title, no quotes or punctuation."
@@ -405,3 +354,23 @@ class Agent:
             return full.content.strip() if full and full.content else message[:50]
         except Exception:
             return message[:50] + ("..." if len(message) > 50 else "")
+
+    async def summarize(self, previous_summary: str | None, conversation: list[dict]) -> str | None:
+        """Fold older turns into a rolling conversation summary."""
+        try:
+            summary_llm = self.summary_completion or build_summary_completion()
+            transcript = "\n".join(f"{m['role']}: {m['content']}" for m in conversation)
+            if previous_summary:
+                transcript = f"Previous summary:\n{previous_summary}\n\nNew turns:\n{transcript}"
+            messages = [
+                SystemMessage(
+                    content="Summarize this coaching conversation in under 150 words. Keep the player's sport, level, goals, equipment and any drills or settings already agreed on. Reply with ONLY the summary."
+                ),
+                HumanMessage(content=transcript),
+            ]
+            full = None
+            async for chunk in summary_llm.get_stream_response(messages):
+                full = chunk if full is None else full + chunk
+            return full.content.strip() if full and full.content else None
+        except Exception:
+            return None
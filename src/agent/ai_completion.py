@@ -1,10 +1,13 @@
 import os
 from collections.abc import AsyncGenerator
 
+import httpx
 from langchain_core.messages import BaseMessage
 from langchain_core.messages.ai import AIMessageChunk
 from langchain_openai import ChatOpenAI
 
+from src.core.config import AGENT_LLM_BACKEND
+
 
 class AICompletion:
     def __init__(
@@ -12,23 +15,42 @@ class AICompletion:
         model: str | None = None,
         temperature: float = 0.7,
         max_tokens: int | None = None,
+        http_async_client: httpx.AsyncClient | None = None,
     ):
+        self.model = model or "gpt-4o"
+        if AGENT_LLM_BACKEND == "fake":
+            # Imported lazily: the recordings are built from the agent's own tools
+            from src.agent.fake_llm import RecordedStreamLLM
+
+            self.llm = self.answer_llm = RecordedStreamLLM(self.model)
+            return
+
         llm_params = {
-            "model": model or "gpt-4o",
+            "model": self.model,
             "api_key": os.getenv("OPENAI_API_KEY"),
             "temperature": temperature,
             "streaming": True,
+            # Report prompt/completion token usage on the final stream chunk
+            "stream_usage": True,
         }
         if max_tokens is not None:
             llm_params["max_tokens"] = max_tokens
+        if http_async_client is not None:
+            # Share keep-alive connections with every other client in the process
+            llm_params["http_async_client"] = http_async_client
 
         self.llm = ChatOpenAI(**llm_params)
+        self.answer_llm = self.llm
 
     def bind_tools(self, tools: list) -> None:
+        # The tools stay declared when calls are disallowed, since the history can
+        # already contain tool calls and results
+        self.answer_llm = self.llm.bind_tools(tools, tool_choice="none")
         self.llm = self.llm.bind_tools(tools)
 
     async def get_stream_response(
-        self, messages: list[BaseMessage]
+        self, messages: list[BaseMessage], allow_tools: bool = True
     ) -> AsyncGenerator[AIMessageChunk, None]:
-        async for chunk in self.llm.astream(messages):
+        llm = self.llm if allow_tools else self.answer_llm
+        async for chunk in llm.astream(messages):
             yield chunk
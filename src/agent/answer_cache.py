@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import logging
+import math
+import operator
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+from src.agent.agent import Agent
+from src.agent.drill_engine import extract_intent
+from src.agent.prompts import SYSTEM_PROMPT
+from src.agent.routing import DEFAULT
+from src.agent.telemetry import TurnStats
+from src.core.config import (
+    AGENT_ANSWER_CACHE,
+    AGENT_ANSWER_CACHE_MAX_ENTRIES,
+    AGENT_ANSWER_CACHE_MAX_QUERY_CHARS,
+    AGENT_ANSWER_CACHE_SIMILARITY,
+    AGENT_ANSWER_CACHE_TTL_SECONDS,
+    AGENT_LOCAL_DRILL_ENGINE,
+)
+from src.core.metrics import Counter, Gauge
+from src.manual.tool import agenerate_query_embedding, search_pongbot_manual
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = Counter(
+    "agent_answer_cache_lookups_total",
+    "Answer cache lookups by outcome (hit_exact, hit_semantic, miss, skip)",
+    labelnames=("result",),
+)
+CACHE_ENTRIES = Gauge("agent_answer_cache_entries", "Answers held in the answer cache")
+
+# Answers are invalidated whenever the prompt changes; the answering model and route are
+# part of each lookup's namespace
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+# text-embedding-3 vectors can be shortened by truncating and renormalizing; 256
+# dimensions are plenty to tell paraphrases apart and keep the scan cheap
+SIMILARITY_DIMENSIONS = 256
+
+# Tools whose output doesn't depend on who is asking
+CACHEABLE_TOOLS = {search_pongbot_manual.name}
+CACHEABLE_EVENTS = {"text_delta", "tool_use_start", "tool_use_end"}
+
+
+def normalize_query(message: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", message.lower()).split())
+
+
+def detect_sport(normalized: str) -> str:
+    return "padel" if "padel" in normalized.split() else "tennis"
+
+
+def _shorten(embedding: list[float]) -> list[float]:
+    vector = embedding[:SIMILARITY_DIMENSIONS]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _most_similar(
+    entries: list["CacheEntry"], embedding: list[float], threshold: float
+) -> "CacheEntry | None":
+    best, best_score = None, threshold
+    for entry in entries:
+        score = sum(map(operator.mul, entry.embedding, embedding))
+        if score >= best_score:
+            best, best_score = entry, score
+    return best
+
+
+@dataclass
+class CacheEntry:
+    namespace: str
+    query: str
+    embedding: list[float] | None
+    events: list[dict]
+    created_at: float
+
+
+class AnswerCache:
+    """LRU + TTL cache of complete answers to stateless first-turn questions.
+
+    Lookups match the normalized query text exactly, then fall back to the most similar
+    cached query in the same sport/model/route/prompt-version namespace above a cosine
+    threshold. Only answers made of text and manual lookups are stored; training sessions
+    and anything following earlier conversation history always go to the model.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = AGENT_ANSWER_CACHE,
+        max_entries: int = AGENT_ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = AGENT_ANSWER_CACHE_TTL_SECONDS,
+        similarity: float = AGENT_ANSWER_CACHE_SIMILARITY,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+
+    def _eligible(self, message: str, conversation_history: list[dict]) -> bool:
+        # Drill edits arrive as JSON; long messages are too specific to repeat; requests
+        # the drill engine answers locally are already free
+        return (
+            self.enabled
+            and not conversation_history
+            and len(message) <= AGENT_ANSWER_CACHE_MAX_QUERY_CHARS
+            and "{" not in message
+            and not (AGENT_LOCAL_DRILL_ENGINE and extract_intent(message))
+        )
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def _get_exact(self, namespace: str, query: str) -> CacheEntry | None:
+        entry = self._entries.get((namespace, query))
+        if entry is None:
+            return None
+        if self._expired(entry, time.monotonic()):
+            del self._entries[(namespace, query)]
+            return None
+        self._entries.move_to_end((namespace, query))
+        return entry
+
+    async def _get_similar(self, namespace: str, embedding: list[float]) -> CacheEntry | None:
+        now = time.monotonic()
+        candidates = [
+            entry
+            for entry in self._entries.values()
+            if entry.namespace == namespace
+            and entry.embedding is not None
+            and not self._expired(entry, now)
+        ]
+        if not candidates:
+            return None
+        # Up to max_entries x 256 multiply-adds: scored off the event loop
+        best = await asyncio.to_thread(_most_similar, candidates, embedding, self.similarity)
+        key = (best.namespace, best.query) if best is not None else None
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        return best
+
+    def _put(self, entry: CacheEntry) -> None:
+        self._entries[(entry.namespace, entry.query)] = entry
+        self._entries.move_to_end((entry.namespace, entry.query))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        CACHE_ENTRIES.set(len(self._entries))
+
+    async def _embed(self, query: str) -> list[float] | None:
+        try:
+            return _shorten(await agenerate_query_embedding(query))
+        except Exception:
+            logger.warning("Answer cache embedding failed; using exact matches only", exc_info=True)
+            return None
+
+    async def run(
+        self,
+        agent: Agent,
+        message: str,
+        conversation_history: list[dict],
+        stats: TurnStats | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """Agent.run with cached answers served for repeated stateless questions."""
+        if not self._eligible(message, conversation_history):
+            if self.enabled:
+                CACHE_LOOKUPS.inc(result="skip")
+            async for event in agent.run(message, conversation_history, stats):
+                yield event
+            return
+
+        query = normalize_query(message)
+        # Fast-route and full-model answers are kept apart, keyed on the model that answers
+        completion, route = agent.select_completion(message, conversation_history)
+        route_name = route.name if route is not None else DEFAULT
+        namespace = f"{detect_sport(query)}:{completion.model}:{route_name}:{PROMPT_VERSION}"
+        embedding = None
+        entry = self._get_exact(namespace, query)
+        if entry is not None:
+            CACHE_LOOKUPS.inc(result="hit_exact")
+        else:
+            embedding = await self._embed(query)
+            if embedding is not None:
+                entry = await self._get_similar(namespace, embedding)
+            CACHE_LOOKUPS.inc(result="hit_semantic" if entry is not None else "miss")
+
+        if entry is not None:
+            if stats is not None:
+                stats.model = "cache"
+                stats.mark_first_token()
+            for event in entry.events:
+                yield dict(event)
+            return
+
+        events = []
+        cacheable = True
+        async for event in agent.run(message, conversation_history, stats):
+            if cacheable:
+                if (
+                    event["type"] not in CACHEABLE_EVENTS
+                    or event.get("is_error")
+                    or event.get("tool", "") not in CACHEABLE_TOOLS | {""}
+                ):
+                    cacheable = False
+                elif event["type"] == "text_delta" and events and events[-1]["type"] == "text_delta":
+                    # Replays don't need the original token boundaries
+                    events[-1]["content"] += event["content"]
+                else:
+                    events.append(dict(event))
+            yield event
+
+        if cacheable and any(e["type"] == "text_delta" for e in events):
+            self._put(CacheEntry(namespace, query, embedding, events, time.monotonic()))
+
+
+answer_cache = AnswerCache()
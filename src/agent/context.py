@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from src.agent.agent import Agent
+from src.agent.db_model import ContentBlock, Conversation, Message
+from src.agent.drill_codec import compact_drills_in_text, compact_session_result
+from src.agent.service import AsyncAgentService
+from src.agent.tokens import count_tokens
+from src.agent.tools import generate_training_session
+from src.core.config import (
+    AGENT_CONTEXT_MAX_MESSAGES,
+    AGENT_CONTEXT_SUMMARY_MIN_MESSAGES,
+    AGENT_CONTEXT_TOKEN_BUDGET,
+)
+from src.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Keeps fire-and-forget summary tasks referenced until they finish
+_summary_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class ConversationContext:
+    """History sent to the model for one turn, assembled from stored messages."""
+
+    history: list[dict] = field(default_factory=list)
+    # Older messages that fell out of the window and aren't covered by the summary yet
+    overflow: list[Message] = field(default_factory=list)
+    tokens: int = 0
+
+
+def _block_text(block: ContentBlock) -> str:
+    if block.tool_name == generate_training_session.name:
+        try:
+            return compact_session_result(block.content)
+        except ValueError:
+            return block.content
+    return compact_drills_in_text(block.content)
+
+
+def message_content(message: Message) -> str:
+    """A stored message as the model sees it.
+
+    Assistant turns include their tool results (generated sessions, manual excerpts) in
+    block order, so follow-ups like "make drill 2 harder" have the drills to work from.
+    """
+    if not any(block.type == "tool_use" for block in message.content_blocks):
+        return message.content
+    parts = []
+    for block in message.content_blocks:
+        if block.type == "tool_use":
+            parts.append(f"[{block.tool_name} result]\n{_block_text(block)}")
+        else:
+            parts.append(block.content)
+    return "\n\n".join(parts)
+
+
+def _message_tokens(message: Message, content: str) -> int:
+    if message.token_count is not None and content is message.content:
+        return message.token_count
+    return count_tokens(content)
+
+
+async def build_context(
+    service: AsyncAgentService,
+    conversation: Conversation,
+    budget: int = AGENT_CONTEXT_TOKEN_BUDGET,
+) -> ConversationContext:
+    """Fit the newest messages (plus the cached summary of older ones) into a token budget."""
+    context = ConversationContext()
+    if conversation.context_summary:
+        context.tokens = count_tokens(conversation.context_summary)
+
+    recent = await service.get_context_messages(
+        conversation.id, after=conversation.context_summary_until, limit=AGENT_CONTEXT_MAX_MESSAGES
+    )
+    window: list[dict] = []
+    for i, message in enumerate(recent):
+        content = message_content(message)
+        tokens = _message_tokens(message, content)
+        if context.tokens + tokens > budget:
+            context.overflow = list(reversed(recent[i:]))
+            break
+        context.tokens += tokens
+        window.append({"role": message.role, "content": content})
+
+    if conversation.context_summary:
+        context.history.append({"role": "summary", "content": conversation.context_summary})
+    context.history.extend(reversed(window))
+    return context
+
+
+async def refresh_summary(agent: Agent, conversation_id: str) -> None:
+    """Fold messages that no longer fit the budget into the conversation's rolling summary.
+
+    No session is held across the summary LLM call: read, summarize, then write.
+    """
+    async with AsyncSessionLocal() as db:
+        service = AsyncAgentService(db)
+        conversation = await service.conversation_repo.get_by_id(conversation_id)
+        if not conversation:
+            return
+        context = await build_context(service, conversation)
+        if len(context.overflow) < AGENT_CONTEXT_SUMMARY_MIN_MESSAGES:
+            return
+        previous_summary = conversation.context_summary
+        overflow = [{"role": m.role, "content": message_content(m)} for m in context.overflow]
+        until = context.overflow[-1].created_at
+
+    summary = await agent.summarize(previous_summary, overflow)
+    if summary:
+        async with AsyncSessionLocal() as db:
+            await AsyncAgentService(db).update_context_summary(conversation_id, summary, until)
+
+
+def schedule_summary_refresh(agent: Agent, conversation_id: str) -> None:
+    async def run():
+        try:
+            await refresh_summary(agent, conversation_id)
+        except Exception:
+            logger.exception("Failed to refresh summary for conversation %s", conversation_id)
+
+    task = asyncio.create_task(run())
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
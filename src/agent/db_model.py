@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -13,11 +13,22 @@ def generate_uuid():
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    # Backs the sidebar listing: a user's live conversations, most recently active first
+    __table_args__ = (
+        Index("ix_conversations_user_deleted_updated", "user_id", "is_deleted", text("updated_at DESC")),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False, index=True)
     title: Mapped[str | None] = mapped_column(String, nullable=True)
     is_deleted: Mapped[bool] = mapped_column(default=False)
+    # Rolling summary of older turns that no longer fit the context budget
+    context_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    context_summary_until: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Maintained on every message insert so listings never touch the messages table
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_message_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_message_preview: Mapped[str | None] = mapped_column(String, nullable=True)
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -28,11 +39,21 @@ class Conversation(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    # Keyset pagination over a conversation's history walks this index
+    __table_args__ = (Index("ix_messages_conversation_created_id", "conversation_id", "created_at", "id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     conversation_id: Mapped[str] = mapped_column(String, ForeignKey("conversations.id"), nullable=False, index=True)
     role: Mapped[str] = mapped_column(String, nullable=False)  # "user" or "assistant"
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    token_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Per-turn usage and latency, recorded on assistant messages
+    prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    ttft_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Set when the client went away and the turn was cut short
+    truncated: Mapped[bool] = mapped_column(default=False, server_default=text("false"))
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
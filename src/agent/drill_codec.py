@@ -0,0 +1,185 @@
+"""Compact text encoding of training sessions and drill cards for the model's context.
+
+The JSON of a session repeats seven key names for every ball of every drill. Whenever
+drills go back to the model (tool results, user-edited drills, history) they are
+written as key lines plus one pipe-separated row per ball instead:
+
+    drill 2: Cross-Court Forehand Rally
+    description: Groove a deep, consistent cross-court forehand.
+    duration: 10 min
+    machine_position: Baseline Left Corner
+    sequence_repetitions: 8
+    focus_points:
+    - Split step as the machine feeds
+    balls (ball_number|spin_type|spin_strength|speed|drop_point|depth|feed):
+    1|Topspin|4|6|-6|12|2.5
+
+Decoding gives back the identical Pydantic models. Pipes, backslashes and newlines
+inside text fields are backslash-escaped so every field stays on its line.
+"""
+
+import json
+
+from pydantic import ValidationError
+
+from src.agent.tools import BallSettings, DrillCard, DrillItem, TrainingPlanCard, TrainingSession
+
+BALL_COLUMNS = tuple(BallSettings.model_fields)
+OUTLINE_COLUMNS = tuple(DrillItem.model_fields)
+BALLS_HEADER = f"balls ({'|'.join(BALL_COLUMNS)}):"
+OUTLINE_HEADER = f"outline ({'|'.join(OUTLINE_COLUMNS)}):"
+
+_ESCAPES = {"\\": "\\\\", "|": "\\|", "\n": "\\n", "\r": "\\r"}
+_UNESCAPES = {"\\": "\\", "|": "|", "n": "\n", "r": "\r"}
+
+
+def _escape(value) -> str:
+    return "".join(_ESCAPES.get(char, char) for char in str(value))
+
+
+def _split(line: str) -> list[str]:
+    """Split a row on unescaped pipes, unescaping each field."""
+    fields, current, chars = [], [], iter(line)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            current.append(_UNESCAPES.get(escaped, escaped))
+        elif char == "|":
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append("".join(current))
+    return fields
+
+
+def _unescape(value: str) -> str:
+    return "|".join(_split(value))
+
+
+def _number(value: str) -> int | float:
+    return float(value) if any(c in value for c in ".eE") else int(value)
+
+
+def encode_drill(drill: DrillCard, training_plan_id: str | None = None) -> str:
+    """Encode a drill card; its plan ID is left out when it matches `training_plan_id`."""
+    lines = [
+        f"drill {drill.drill_number}: {_escape(drill.title)}",
+        f"description: {_escape(drill.description)}",
+        f"duration: {_escape(drill.duration)}",
+        f"machine_position: {_escape(drill.machine_position)}",
+        f"sequence_repetitions: {drill.sequence_repetitions}",
+    ]
+    if drill.training_plan_id != (training_plan_id or ""):
+        lines.append(f"training_plan_id: {_escape(drill.training_plan_id)}")
+    lines.append("focus_points:")
+    lines.extend(f"- {_escape(point)}" for point in drill.focus_points)
+    lines.append(BALLS_HEADER)
+    for ball in drill.ball_sequence:
+        lines.append("|".join(_escape(getattr(ball, column)) for column in BALL_COLUMNS))
+    return "\n".join(lines)
+
+
+def encode_plan(plan: TrainingPlanCard) -> str:
+    lines = [
+        f"plan: {_escape(plan.title)}",
+        f"description: {_escape(plan.description)}",
+        f"total_duration: {_escape(plan.total_duration)}",
+        f"difficulty: {_escape(plan.difficulty)}",
+        f"sport: {_escape(plan.sport)}",
+        f"training_plan_id: {_escape(plan.training_plan_id)}",
+        OUTLINE_HEADER,
+    ]
+    for item in plan.drills:
+        lines.append("|".join(_escape(getattr(item, column)) for column in OUTLINE_COLUMNS))
+    return "\n".join(lines)
+
+
+def encode_session(session: TrainingSession) -> str:
+    plan_id = session.plan.training_plan_id
+    blocks = [encode_plan(session.plan)]
+    blocks.extend(encode_drill(drill, plan_id) for drill in session.drills)
+    return "\n\n".join(blocks)
+
+
+def _parse_block(block: str) -> tuple[str, str, dict, list[str], list[list[str]]]:
+    """Split a block into its kind, heading, key fields, list items and table rows."""
+    lines = block.split("\n")
+    kind, _, heading = lines[0].partition(": ")
+    fields: dict[str, str] = {}
+    items: list[str] = []
+    rows: list[list[str]] = []
+    in_table = False
+    for line in lines[1:]:
+        if line in (BALLS_HEADER, OUTLINE_HEADER):
+            in_table = True
+        elif in_table:
+            rows.append(_split(line))
+        elif line.startswith("- "):
+            items.append(_unescape(line[2:]))
+        elif line != "focus_points:":
+            key, _, value = line.partition(": ")
+            fields[key] = _unescape(value)
+    return kind, _unescape(heading), fields, items, rows
+
+
+def decode_drill(block: str, training_plan_id: str = "") -> DrillCard:
+    """Decode a drill card; a missing plan ID is taken from `training_plan_id`."""
+    kind, title, fields, focus_points, rows = _parse_block(block)
+    return DrillCard(
+        title=title,
+        description=fields["description"],
+        drill_number=int(kind.removeprefix("drill ")),
+        duration=fields["duration"],
+        machine_position=fields["machine_position"],
+        ball_sequence=[
+            BallSettings(
+                **{
+                    column: value if column == "spin_type" else _number(value)
+                    for column, value in zip(BALL_COLUMNS, row, strict=True)
+                }
+            )
+            for row in rows
+        ],
+        sequence_repetitions=int(fields["sequence_repetitions"]),
+        focus_points=focus_points,
+        training_plan_id=fields.get("training_plan_id", training_plan_id),
+    )
+
+
+def decode_session(text: str) -> TrainingSession:
+    plan_block, *drill_blocks = text.split("\n\n")
+    _, title, fields, _, rows = _parse_block(plan_block)
+    plan = TrainingPlanCard(
+        title=title,
+        description=fields["description"],
+        total_duration=fields["total_duration"],
+        difficulty=fields["difficulty"],
+        sport=fields["sport"],
+        drills=[DrillItem(**dict(zip(OUTLINE_COLUMNS, row, strict=True))) for row in rows],
+        training_plan_id=fields["training_plan_id"],
+    )
+    drills = [decode_drill(block, plan.training_plan_id) for block in drill_blocks]
+    return TrainingSession(plan=plan, drills=drills)
+
+
+def compact_session_result(result: str) -> str:
+    """generate_training_session output (session JSON) in the compact encoding."""
+    return encode_session(TrainingSession.model_validate_json(result))
+
+
+def compact_drills_in_text(text: str) -> str:
+    """Replace a drill card JSON embedded in a message (e.g. a user edit) by its encoding.
+
+    Text without a valid drill card is returned unchanged.
+    """
+    if "ball_sequence" not in text:
+        return text
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return text
+    try:
+        drill = DrillCard.model_validate(json.loads(text[start : end + 1]))
+    except (ValueError, ValidationError):
+        return text
+    return f"{text[:start]}{encode_drill(drill)}{text[end + 1 :]}"
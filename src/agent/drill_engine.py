@@ -0,0 +1,363 @@
+"""Rule-based training session generator for common, fully specified requests.
+
+Encodes the parameter formulas, tactical patterns and legal serve boxes from the system
+prompt so requests like "30 min intermediate cross-court forehand" can be answered
+locally, without an LLM round trip.
+"""
+
+import re
+from dataclasses import dataclass
+
+from src.agent.drill_repair import MACHINE_POSITIONS
+from src.agent.tools import (
+    BallSettings,
+    DrillCard,
+    DrillItem,
+    TrainingPlanCard,
+    TrainingSession,
+)
+
+LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3, "elite": 4}
+LEVEL_NAMES = {level: name for name, level in LEVELS.items()}
+
+
+@dataclass(frozen=True)
+class Pattern:
+    title: str
+    description: str
+    focus_points: tuple[str, ...]
+    # (drop_point, depth) per ball; depth is relative to the level's base depth unless serve
+    balls: tuple[tuple[int, int], ...]
+    spin_type: str = "Topspin"
+    machine_position: int = 0  # index into MACHINE_POSITIONS
+    serve: bool = False
+
+
+@dataclass(frozen=True)
+class DrillIntent:
+    sport: str
+    level: int
+    stroke: str
+    duration_minutes: int
+
+
+# Main pattern per stroke, keyed by sport
+PATTERNS: dict[str, dict[str, Pattern]] = {
+    "tennis": {
+        "crosscourt forehand": Pattern(
+            "Cross-Court Forehand Rally",
+            "Groove a deep, consistent cross-court forehand with recovery to center.",
+            ("Split step as the machine feeds", "Swing low to high through the ball", "Recover to the center mark after every shot"),
+            ((6, 0), (6, -2), (6, 2), (4, 0), (6, 0), (8, -1)),
+            machine_position=1,
+        ),
+        "crosscourt backhand": Pattern(
+            "Cross-Court Backhand Rally",
+            "Build a reliable cross-court backhand that holds up in rallies.",
+            ("Early unit turn with the shoulders", "Contact the ball out in front", "Finish high and recover"),
+            ((-6, 0), (-6, -2), (-6, 2), (-4, 0), (-6, 0), (-8, -1)),
+            machine_position=2,
+        ),
+        "inside-out forehand": Pattern(
+            "Inside-Out Forehand Attack",
+            "Run around the backhand corner and attack with the inside-out forehand.",
+            ("Move your feet early to get around the ball", "Open the racket face toward the target", "Recover quickly after the attack"),
+            ((-6, 0), (-4, 0), (-6, 1), (-5, -1), (-6, 0), (-3, 0)),
+            machine_position=2,
+        ),
+        "forehand": Pattern(
+            "Forehand Consistency",
+            "Repeat the forehand motion until it is automatic.",
+            ("Stay relaxed through the swing", "Watch the ball onto the strings", "Follow through over the opposite shoulder"),
+            ((6, 0), (5, 0), (6, -1), (6, 1), (5, 0), (6, 0)),
+        ),
+        "backhand": Pattern(
+            "Backhand Consistency",
+            "Repeat the backhand motion with a stable contact point.",
+            ("Turn the shoulders early", "Keep the head still at contact", "Extend through the target"),
+            ((-6, 0), (-6, 0), (-5, -1), (-6, 1), (-6, 0), (-5, 0)),
+        ),
+        "alternating": Pattern(
+            "Alternating Corners Rally",
+            "Alternate forehand and backhand to train recovery footwork.",
+            ("Split step before every ball", "Use crossover steps to the corners", "Recover to the middle after each shot"),
+            ((-6, 0), (6, 0), (-6, -2), (6, 2), (0, 0), (8, -1)),
+        ),
+        "deuce serve": Pattern(
+            "Deuce Court Serve Return",
+            "Return serves landing in the deuce service box.",
+            ("Split step as the ball leaves the machine", "Short compact backswing", "Aim deep through the middle"),
+            ((2, 7), (3, 8), (1, 6), (4, 9), (2, 5), (3, 7)),
+            spin_type="No Spin",
+            serve=True,
+        ),
+        "ad serve": Pattern(
+            "Ad Court Serve Return",
+            "Return serves landing in the ad service box.",
+            ("Split step as the ball leaves the machine", "Short compact backswing", "Aim deep through the middle"),
+            ((-2, 7), (-3, 8), (-1, 6), (-4, 9), (-2, 5), (-3, 7)),
+            spin_type="No Spin",
+            serve=True,
+        ),
+        "volley": Pattern(
+            "Net Volley Reflexes",
+            "Sharpen volley reactions with short balls to both sides.",
+            ("Racket up and in front of the body", "Punch, don't swing", "Step toward the ball"),
+            ((-3, -6), (3, -6), (-2, -7), (2, -7), (0, -6), (4, -6)),
+            spin_type="No Spin",
+        ),
+    },
+    "padel": {
+        "wall defense": Pattern(
+            "Back Wall Defense",
+            "Defend balls off the back glass and reset the point.",
+            ("Let the ball come off the glass", "Stay low and compact", "Lift the ball high and deep"),
+            ((-7, 2), (-7, 1), (-6, 2), (-7, 0), (-5, 2), (-7, 1)),
+            machine_position=1,
+        ),
+        "net transition": Pattern(
+            "Net Transition Pattern",
+            "Move forward from the back of the court to take the net.",
+            ("Move forward after a deep ball", "Split step before the volley", "Keep the volley low and deep"),
+            ((-4, 0), (4, 0), (-4, -3), (4, -3), (-4, -5), (4, -5)),
+        ),
+        "attack": Pattern(
+            "Attack Setup",
+            "Set up and finish attacking shots from the front of the court.",
+            ("Prepare early with a high racket", "Choose placement over power", "Recover to the net after attacking"),
+            ((4, -2), (7, -2), (4, -3), (7, -1), (4, -2), (7, -3)),
+            machine_position=2,
+        ),
+    },
+}
+
+# Opens every session before the main pattern
+WARMUP = Pattern(
+    "Rhythm Warm-Up",
+    "Find your rhythm with steady, central balls.",
+    ("Relaxed grip and smooth swing", "Move your feet to every ball"),
+    ((0, 0), (2, 0), (-2, 0), (0, -1), (2, 1), (-2, 0)),
+)
+
+STROKE_ALIASES = {
+    "tennis": (
+        (r"cross[\s-]?court forehand", "crosscourt forehand"),
+        (r"cross[\s-]?court backhand", "crosscourt backhand"),
+        (r"inside[\s-]?out(?: forehands?)?", "inside-out forehand"),
+        (r"volleys?", "volley"),
+        (r"alternat\w*(?: (?:forehands? and backhands?|backhands? and forehands?))?|footwork", "alternating"),
+        (r"forehand", "forehand"),
+        (r"backhand", "backhand"),
+    ),
+    "padel": (
+        (r"wall|glass|defen[cs]e", "wall defense"),
+        (r"transition|\bnet\b", "net transition"),
+        (r"attack|smash|bandeja|vibora", "attack"),
+    ),
+}
+
+# Serve drills need an explicit service box; "serve practice" alone goes to the model
+_SERVE_RE = re.compile(r"\bserv\w*|\breturns?\b")
+SERVE_BOXES = (
+    (r"\bdeuce\b|\bright[\s-]?(?:court|box|side)\b", "deuce serve"),
+    (r"\bad\b|\badvantage\b|\bleft[\s-]?(?:court|box|side)\b", "ad serve"),
+)
+
+_DURATION_RE = re.compile(
+    r"\b(\d{1,3})\s*-?\s*(?:min|mins|minutes?)\b|\b(\d(?:\.\d)?|an?)\s*(?:h|hr|hrs|hours?)\b"
+)
+_LEVEL_RE = re.compile(r"\b(beginner|novice|intermediate|advanced|elite)\b")
+_LEVEL_ALIASES = {"novice": "beginner"}
+# Questions about training get an answer from the model, not a generated session
+_QUESTION_RE = re.compile(r"\b(?:why|how|what|which|when|should|explain|difference|benefits?)\b")
+_REQUEST_RE = re.compile(
+    r"\b(?:make|build|create|give|generate|plan|design|set up|put together|want|need|send)\b"
+)
+# "not a beginner", "no longer intermediate": the stated level is the one to avoid
+_NEGATED_RE = re.compile(r"\b(?:not|no|never|isn't|aren't|wasn't)\b(?:\W+\w+){0,3}\W*$")
+# Spin, pace, placement and structure words the patterns can't honour: a request still
+# containing one once its stroke is matched goes to the model
+_CONSTRAINT_RE = re.compile(
+    r"\b(?:slice|underspin|backspin|topspin|spin|flat|lobs?|slow\w*|fast\w*|quick\w*|"
+    r"hard|soft|pace|speed|power|deep|short|depth|high|low|net|baseline|left|right|corners?|"
+    r"wide|middle|center|centre|without|no|not|skip|except|only|avoid|don't)\b"
+)
+# Markers of a generated session or drill card earlier in the conversation
+_SESSION_CONTEXT_MARKERS = ("training_plan_id", "ball_sequence")
+
+# Longer or structured messages carry nuance the rules can't capture
+MAX_MESSAGE_LENGTH = 160
+
+
+def _has_session_context(history: list[dict]) -> bool:
+    return any(
+        marker in message.get("content", "")
+        for message in history
+        for marker in _SESSION_CONTEXT_MARKERS
+    )
+
+
+def _match_strokes(text: str, sport: str) -> tuple[set[str | None], str]:
+    """Strokes named in the message, and the text left once their words are removed.
+
+    A serve request without a service box yields None among the strokes.
+    """
+    strokes: set[str | None] = set()
+    if sport == "tennis" and _SERVE_RE.search(text):
+        text = _SERVE_RE.sub(" ", text)
+        boxes = {name for pattern, name in SERVE_BOXES if re.search(pattern, text)}
+        strokes |= boxes or {None}
+        for pattern, _ in SERVE_BOXES:
+            text = re.sub(pattern, " ", text)
+    for pattern, name in STROKE_ALIASES[sport]:
+        text, count = re.subn(pattern, " ", text)
+        if count:
+            strokes.add(name)
+    return strokes, text
+
+
+def extract_intent(message: str, history: list[dict] | None = None) -> DrillIntent | None:
+    """Extract a structured session request, or None unless every field is explicit.
+
+    Only imperative requests for a single stroke qualify: questions, negated levels,
+    several strokes, leftover spin/pace/placement/exclusion words and messages following
+    an earlier session (likely edits of it) are left to the model.
+    """
+    text = message.lower().strip()
+    if len(text) > MAX_MESSAGE_LENGTH or "{" in text:
+        return None
+    if _QUESTION_RE.search(text) or ("?" in text and not _REQUEST_RE.search(text)):
+        return None
+    if history and _has_session_context(history):
+        return None
+
+    duration_match = _DURATION_RE.search(text)
+    level_matches = list(_LEVEL_RE.finditer(text))
+    if not duration_match or not level_matches:
+        return None
+    level_match = level_matches[0]
+    if len({match.group(1) for match in level_matches}) > 1:
+        return None
+    if _NEGATED_RE.search(text[: level_match.start()]):
+        return None
+    if duration_match.group(1):
+        duration = int(duration_match.group(1))
+    else:
+        hours = duration_match.group(2)
+        duration = int(60 * (1.0 if hours in ("a", "an") else float(hours)))
+    if not 10 <= duration <= 120:
+        return None
+
+    sport = "padel" if "padel" in text else "tennis"
+    strokes, rest = _match_strokes(text, sport)
+    if len(strokes) != 1 or None in strokes:
+        return None
+    if _CONSTRAINT_RE.search(rest):
+        return None
+    stroke = strokes.pop()
+
+    level_name = _LEVEL_ALIASES.get(level_match.group(1), level_match.group(1))
+    return DrillIntent(
+        sport=sport, level=LEVELS[level_name], stroke=stroke, duration_minutes=duration
+    )
+
+
+def level_parameters(level: int) -> dict:
+    """Parameter formulas from the system prompt."""
+    return {
+        "speed": 2 + 2 * level,
+        "spin_strength": 2 * level,
+        "feed": 3.5 - 0.5 * level,
+        "depth": 8 + 2 * level,
+    }
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def _build_drill(
+    pattern: Pattern, intent: DrillIntent, drill_number: int, minutes: int, intensity: int
+) -> DrillCard:
+    params = level_parameters(intent.level)
+    speed = int(_clamp(params["speed"] + intensity, 0, 10))
+    feed = round(_clamp(params["feed"] - 0.25 * intensity, 0.8, 5.0), 2)
+    spin_strength = 0 if pattern.spin_type == "No Spin" else int(_clamp(params["spin_strength"], 0, 10))
+
+    balls = []
+    for number, (drop_point, depth) in enumerate(pattern.balls, start=1):
+        if not pattern.serve:
+            depth = params["depth"] + depth
+        balls.append(
+            BallSettings(
+                ball_number=number,
+                spin_type=pattern.spin_type,
+                spin_strength=spin_strength,
+                speed=speed,
+                drop_point=int(_clamp(drop_point, -10, 10)),
+                depth=int(_clamp(depth, 0, 20)),
+                feed=feed,
+            )
+        )
+
+    repetitions = int(_clamp(round(minutes * 60 / (6 * feed)), 1, 20))
+    return DrillCard(
+        title=pattern.title,
+        description=pattern.description,
+        drill_number=drill_number,
+        duration=f"{minutes} min",
+        machine_position=MACHINE_POSITIONS[intent.sport][pattern.machine_position],
+        ball_sequence=balls,
+        sequence_repetitions=repetitions,
+        focus_points=list(pattern.focus_points),
+    )
+
+
+def build_session(intent: DrillIntent) -> TrainingSession:
+    """Build a three-drill session: warm-up, main pattern, then a faster progression."""
+    main = PATTERNS[intent.sport][intent.stroke]
+    # Blocks add up to exactly the requested duration
+    warmup_minutes = max(1, round(intent.duration_minutes * 0.25))
+    progression_minutes = max(1, round(intent.duration_minutes * 0.35))
+    main_minutes = intent.duration_minutes - warmup_minutes - progression_minutes
+
+    drills = [
+        _build_drill(WARMUP, intent, 1, warmup_minutes, intensity=-1),
+        _build_drill(main, intent, 2, main_minutes, intensity=0),
+        _build_drill(main, intent, 3, progression_minutes, intensity=1),
+    ]
+    drills[2].title = f"{main.title} Pressure"
+    drills[2].description = "Same pattern with faster feeds and more pace to add match pressure."
+
+    level_name = LEVEL_NAMES[intent.level]
+    plan = TrainingPlanCard(
+        title=f"{main.title} Session",
+        description=f"A {intent.duration_minutes}-minute {level_name} {intent.sport} session built around the {main.title.lower()}.",
+        total_duration=f"{intent.duration_minutes} min",
+        difficulty=level_name,
+        sport=intent.sport,
+        drills=[
+            DrillItem(name=d.title, duration=d.duration, focus=d.description) for d in drills
+        ],
+    )
+    for drill in drills:
+        drill.training_plan_id = plan.training_plan_id
+    return TrainingSession(plan=plan, drills=drills)
+
+
+def describe_session(intent: DrillIntent, session: TrainingSession) -> str:
+    """Coach-style explanation of the generated session, written before the cards appear."""
+    main = session.drills[1]
+    first = main.ball_sequence[0]
+    level_name = LEVEL_NAMES[intent.level]
+    drops = ", ".join(f"{b.drop_point:+d}" for b in main.ball_sequence)
+    return (
+        f"Let's get to work on that {intent.stroke}! 🎾🔥 I've built a {intent.duration_minutes}-minute "
+        f"{level_name} session in three steps. We start with a {session.drills[0].duration} rhythm "
+        f"warm-up to find your timing, then move into the main drill, {main.title}: the machine "
+        f"cycles through 6 balls landing at {drops}, so you practice the exact pattern you'll see in "
+        f"matches. Speed {first.speed} with a {first.feed}s feed matches a realistic {level_name} rally "
+        f"pace. To finish, the pressure round speeds up the feed so the pattern holds when you're "
+        f"tired. Focus on {main.focus_points[0].lower()} and {main.focus_points[-1].lower()}. "
+        f"Do this 2-3 times a week and you'll feel the difference! 💪⭐"
+    )
@@ -0,0 +1,197 @@
+"""In-process validation and repair of generated training sessions.
+
+The Pydantic card models only check types and basic ranges; the court rules the system
+prompt asks for (legal ranges, exact machine positions, six balls numbered 1-6, one
+service box per serve drill) are enforced here on the raw tool arguments, before
+validation, so a slightly wrong card is fixed instead of rejected or re-prompted.
+"""
+
+import re
+
+from src.core.metrics import Counter
+
+DRILL_REPAIRS = Counter(
+    "agent_drill_repairs_total",
+    "Corrections applied to model-generated training sessions",
+    labelnames=("fix",),
+)
+
+BALLS_PER_DRILL = 6
+
+MACHINE_POSITIONS = {
+    "tennis": ("Baseline Center", "Baseline Left Corner", "Baseline Right Corner"),
+    "padel": ("Center Back Glass", "Left Back Glass", "Right Back Glass"),
+}
+SPIN_TYPES = ("Topspin", "No Spin", "Underspin")
+
+# (low, high, integer) per numeric ball parameter
+BALL_RANGES = {
+    "spin_strength": (0, 10, True),
+    "speed": (0, 10, True),
+    "drop_point": (-10, 10, True),
+    "depth": (0, 20, True),
+    "feed": (0.8, 5.0, False),
+}
+# Intermediate-level values, used when a parameter is missing from every ball
+BALL_DEFAULTS = {
+    "spin_type": "Topspin",
+    "spin_strength": 4,
+    "speed": 6,
+    "drop_point": 0,
+    "depth": 12,
+    "feed": 2.5,
+}
+
+# Serves land between the net and the service line, all in one box
+SERVE_DEPTH = {"tennis": (1, 10), "padel": (1, 11)}
+SERVE_BOXES = {"deuce": (0, 4), "ad": (-4, 0)}
+SERVE_RE = re.compile(r"\bserv(e|es|ing)\b")
+
+
+def normalize_sport(sport) -> str:
+    return "padel" if "padel" in str(sport).lower() else "tennis"
+
+
+def snap_spin_type(value) -> str:
+    key = re.sub(r"[^a-z]", "", str(value).lower())
+    if "under" in key or "back" in key or "slice" in key:
+        return "Underspin"
+    if "flat" in key or key.startswith("no"):
+        return "No Spin"
+    return "Topspin"
+
+
+def snap_machine_position(value, sport: str) -> str:
+    key = str(value).lower()
+    side = 1 if "left" in key else 2 if "right" in key else 0
+    return MACHINE_POSITIONS[sport][side]
+
+
+def _number(value) -> float | None:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _clamp(value: float, low: float, high: float, integer: bool) -> int | float:
+    value = max(low, min(high, value))
+    return int(round(value)) if integer else round(value, 2)
+
+
+def _repair_column(balls: list[dict], column: str) -> bool:
+    """Fill, coerce and clamp one parameter across the sequence; True if anything changed."""
+    values = [ball.get(column) for ball in balls]
+    if column == "spin_type":
+        present = [v for v in values if v is not None]
+        fill = snap_spin_type(present[0]) if present else BALL_DEFAULTS[column]
+        repaired = [snap_spin_type(v) if v is not None else fill for v in values]
+    else:
+        low, high, integer = BALL_RANGES[column]
+        numbers = [_number(v) for v in values]
+        present = [n for n in numbers if n is not None]
+        fill = present[0] if present else BALL_DEFAULTS[column]
+        repaired = [_clamp(fill if n is None else n, low, high, integer) for n in numbers]
+    if repaired == values:
+        return False
+    for ball, value in zip(balls, repaired, strict=True):
+        ball[column] = value
+    return True
+
+
+def _repair_serve_box(balls: list[dict], sport: str) -> list[str]:
+    fixes = []
+    drops = [ball["drop_point"] for ball in balls]
+    low, high = SERVE_BOXES["deuce" if sum(drops) >= 0 else "ad"]
+    if any(not low <= drop <= high for drop in drops):
+        fixes.append("serve_box")
+        for ball in balls:
+            ball["drop_point"] = max(low, min(high, ball["drop_point"]))
+    low, high = SERVE_DEPTH[sport]
+    if any(not low <= ball["depth"] <= high for ball in balls):
+        fixes.append("serve_depth")
+        for ball in balls:
+            ball["depth"] = max(low, min(high, ball["depth"]))
+    return fixes
+
+
+def repair_plan(plan: dict) -> list[str]:
+    sport = normalize_sport(plan.get("sport", "tennis"))
+    if plan.get("sport") == sport:
+        return []
+    plan["sport"] = sport
+    return ["sport"]
+
+
+def repair_drill(drill: dict, sport: str = "tennis", drill_number: int | None = None) -> list[str]:
+    """Repair one drill card in place and return the names of the fixes applied.
+
+    Cards without any ball settings are left for validation to reject: there is nothing
+    to rebuild the sequence from.
+    """
+    fixes = []
+    balls = drill.get("ball_sequence")
+    if not isinstance(balls, list):
+        return fixes
+    balls = [ball for ball in balls if isinstance(ball, dict)]
+    if not balls:
+        return fixes
+
+    if len(balls) != BALLS_PER_DRILL:
+        # Extra balls are dropped; a short sequence repeats its pattern
+        fixes.append("ball_count")
+        balls = [dict(balls[i % len(balls)]) for i in range(BALLS_PER_DRILL)]
+    drill["ball_sequence"] = balls
+
+    # The sequence is a 6x7 table: repair it a parameter (column) at a time
+    for column in BALL_DEFAULTS:
+        if _repair_column(balls, column):
+            fixes.append(column)
+
+    if SERVE_RE.search(f"{drill.get('title', '')} {drill.get('description', '')}".lower()):
+        fixes.extend(_repair_serve_box(balls, sport))
+
+    if [ball.get("ball_number") for ball in balls] != list(range(1, BALLS_PER_DRILL + 1)):
+        fixes.append("ball_number")
+        for number, ball in enumerate(balls, start=1):
+            ball["ball_number"] = number
+
+    position = drill.get("machine_position")
+    if position not in MACHINE_POSITIONS[sport]:
+        fixes.append("machine_position")
+        drill["machine_position"] = snap_machine_position(position or "", sport)
+
+    repetitions = _number(drill.get("sequence_repetitions"))
+    if repetitions is not None:
+        repaired = _clamp(repetitions, 1, 20, integer=True)
+        if repaired != drill["sequence_repetitions"]:
+            fixes.append("sequence_repetitions")
+            drill["sequence_repetitions"] = repaired
+
+    if drill_number is not None and drill.get("drill_number") != drill_number:
+        fixes.append("drill_number")
+        drill["drill_number"] = drill_number
+    return fixes
+
+
+def repair_session(session: dict) -> list[str]:
+    """Repair generate_training_session arguments ({"plan", "drills"}) in place."""
+    fixes = []
+    plan = session.get("plan")
+    sport = "tennis"
+    if isinstance(plan, dict):
+        fixes.extend(repair_plan(plan))
+        sport = plan["sport"]
+    drills = session.get("drills")
+    if isinstance(drills, list):
+        for number, drill in enumerate(drills, start=1):
+            if isinstance(drill, dict):
+                fixes.extend(repair_drill(drill, sport, drill_number=number))
+    return fixes
+
+
+def record_repairs(fixes: list[str]) -> None:
+    for fix in fixes:
+        DRILL_REPAIRS.inc(fix=fix)
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import math
+import re
+import uuid
+from collections.abc import AsyncIterator
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.ai import AIMessageChunk
+
+from src.agent.prompts import MANUAL, classify_intent
+from src.agent.tokens import count_tokens
+from src.core.config import (
+    AGENT_FAKE_LLM_FIRST_TOKEN_MS,
+    AGENT_FAKE_LLM_RECORDINGS,
+    AGENT_FAKE_LLM_TOKEN_DELAY_MS,
+)
+
+# Recording names; a recordings file may replace any of them
+TEXT = "text"
+TRAINING_SESSION = "training_session"
+MANUAL_SEARCH = "manual_search"
+FOLLOWUP = "followup"
+TITLE = "title"
+SUMMARY = "summary"
+
+SESSION_RE = re.compile(r"\b(session|drill|drills|workout|plan|practi[cs]e|train|training)\b")
+
+
+def text_chunks(text: str) -> list[dict]:
+    """One chunk per word, roughly the granularity OpenAI streams at."""
+    return [{"content": word} for word in re.findall(r"\S+\s*", text)]
+
+
+def tool_call_chunks(name: str, args: dict, step: int = 24) -> list[dict]:
+    """A streamed tool call: the head with name and ID, then the arguments in slices."""
+    raw = json.dumps(args)
+    chunks = [{"tool_call_chunks": [{"name": name, "args": "", "id": "call_0", "index": 0}]}]
+    for start in range(0, len(raw), step):
+        chunks.append(
+            {
+                "tool_call_chunks": [
+                    {"name": None, "args": raw[start : start + step], "id": None, "index": 0}
+                ]
+            }
+        )
+    return chunks
+
+
+def default_recordings() -> dict[str, list[dict]]:
+    # Imported here: the drill engine and tools import the agent package's models
+    from src.agent.drill_engine import LEVELS, DrillIntent, build_session
+    from src.agent.tools import generate_training_session
+    from src.manual.tool import search_pongbot_manual
+
+    session = build_session(
+        DrillIntent(
+            sport="tennis",
+            level=LEVELS["intermediate"],
+            stroke="crosscourt forehand",
+            duration_minutes=30,
+        )
+    )
+    return {
+        TEXT: text_chunks(
+            "Great question! Keep your racquet head up, turn your shoulders early and "
+            "finish the swing over your opposite shoulder. Stay relaxed through contact "
+            "and let the legs drive the stroke rather than the arm."
+        ),
+        TRAINING_SESSION: text_chunks(
+            "Here's a 30-minute session that builds a deep, consistent cross-court "
+            "forehand, starting with rhythm and finishing under pressure. "
+        )
+        + tool_call_chunks(
+            generate_training_session.name, {"session": session.model_dump()}
+        ),
+        MANUAL_SEARCH: tool_call_chunks(
+            search_pongbot_manual.name, {"query": "connect the app to the PongBot"}
+        ),
+        FOLLOWUP: text_chunks(
+            "According to the manual, turn the machine on, enable Bluetooth on your phone "
+            "and pair from the app's device screen (see page 12)."
+        ),
+        TITLE: text_chunks("Forehand Training Session"),
+        SUMMARY: text_chunks(
+            "Intermediate tennis player working on a cross-court forehand with a PongBot."
+        ),
+    }
+
+
+def load_recordings(path: str) -> dict[str, list[dict]]:
+    recordings = default_recordings()
+    if path:
+        with open(path) as f:
+            recordings.update(json.load(f))
+    return recordings
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """Deterministic unit vector for a text, so vector search still runs on real rows."""
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        digest = hashlib.sha256(f"{counter}:{text}".encode()).digest()
+        values.extend(byte / 127.5 - 1.0 for byte in digest)
+        counter += 1
+    values = values[:dimensions]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class RecordedStreamLLM:
+    """Stands in for ChatOpenAI by replaying recorded AIMessageChunk streams.
+
+    The recording is picked from the conversation the way the real model would answer
+    it: a follow-up after tool results, a manual lookup for PongBot questions, a
+    training session when one is asked for and plain text otherwise. Streams start
+    after `first_token_ms` and then emit a chunk every `token_delay_ms`.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        recordings: dict[str, list[dict]] | None = None,
+        first_token_ms: float = AGENT_FAKE_LLM_FIRST_TOKEN_MS,
+        token_delay_ms: float = AGENT_FAKE_LLM_TOKEN_DELAY_MS,
+        tools_bound: bool = False,
+    ):
+        self.model = model
+        self.recordings = recordings if recordings is not None else load_recordings(
+            AGENT_FAKE_LLM_RECORDINGS
+        )
+        self.first_token_ms = first_token_ms
+        self.token_delay_ms = token_delay_ms
+        self.tools_bound = tools_bound
+
+    def bind_tools(self, tools: list, tool_choice: str | None = None) -> "RecordedStreamLLM":
+        return RecordedStreamLLM(
+            self.model,
+            self.recordings,
+            self.first_token_ms,
+            self.token_delay_ms,
+            tools_bound=tool_choice != "none",
+        )
+
+    def pick(self, messages: list[BaseMessage]) -> str:
+        if isinstance(messages[-1], ToolMessage):
+            return FOLLOWUP
+        if not self.tools_bound:
+            system = messages[0].content if isinstance(messages[0], SystemMessage) else ""
+            return TITLE if "title" in system.lower() else SUMMARY
+        message = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        if classify_intent(message) == MANUAL:
+            return MANUAL_SEARCH
+        if SESSION_RE.search(message.lower()):
+            return TRAINING_SESSION
+        return TEXT
+
+    async def astream(self, messages: list[BaseMessage]) -> AsyncIterator[AIMessageChunk]:
+        recording = self.recordings[self.pick(messages)]
+        # Tool call IDs have to be unique within a conversation
+        call_suffix = uuid.uuid4().hex[:8]
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for position, recorded in enumerate(recording):
+            if position:
+                await asyncio.sleep(self.token_delay_ms / 1000)
+            chunk = {"content": "", **recorded}
+            if chunk.get("tool_call_chunks"):
+                chunk["tool_call_chunks"] = [
+                    {**tc, "id": f"{tc['id']}_{call_suffix}" if tc.get("id") else None}
+                    for tc in chunk["tool_call_chunks"]
+                ]
+            yield AIMessageChunk(**chunk)
+        prompt_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        yield AIMessageChunk(
+            content="",
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": len(recording),
+                "total_tokens": prompt_tokens + len(recording),
+            },
+        )
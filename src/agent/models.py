@@ -10,6 +10,7 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Deprecated: history is now assembled server-side from stored messages
     conversation_history: list[ChatMessage] = []
     conversation_id: str | None = None
 
@@ -36,6 +37,7 @@ class MessageResponse(BaseModel):
     role: str
     content: str
     created_at: str
+    truncated: bool = False
     content_blocks: list[ContentBlockResponse] = []
 
 
@@ -44,6 +46,9 @@ class ConversationResponse(BaseModel):
     title: str | None = None
     created_at: str
     updated_at: str
+    message_count: int = 0
+    last_message_at: str | None = None
+    last_message_preview: str | None = None
 
 
 class ConversationDetail(ConversationResponse):
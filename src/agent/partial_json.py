@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class _Frame:
+    is_object: bool
+    path: tuple
+    start: int
+    key: str | None = None
+    index: int = 0
+    expect_key: bool = False
+    key_start: int = -1
+
+
+class IncrementalJsonScanner:
+    """Scans a JSON document as it streams in and reports each object/array once it closes.
+
+    feed() returns (path, raw_json) pairs for containers completed by the new chunk, where
+    path is the sequence of object keys and array indexes leading to the container, e.g.
+    ("session", "drills", 0). Scalars are not reported; parse the raw JSON of their parent.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+
+    def _child_path(self) -> tuple:
+        if not self._stack:
+            return ()
+        top = self._stack[-1]
+        return top.path + ((top.key,) if top.is_object else (top.index,))
+
+    def feed(self, chunk: str) -> list[tuple[tuple, str]]:
+        completed = []
+        offset = len(self.text)
+        self.text += chunk
+        for i, ch in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    top = self._stack[-1] if self._stack else None
+                    if top is not None and top.key_start >= 0:
+                        top.key = self.text[top.key_start + 1 : i]
+                        top.key_start = -1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                top = self._stack[-1] if self._stack else None
+                if top is not None and top.is_object and top.expect_key:
+                    top.key_start = i
+            elif ch in "{[":
+                is_object = ch == "{"
+                self._stack.append(
+                    _Frame(is_object=is_object, path=self._child_path(), start=i, expect_key=is_object)
+                )
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                frame = self._stack.pop()
+                completed.append((frame.path, self.text[frame.start : i + 1]))
+            elif ch == ":" and self._stack:
+                self._stack[-1].expect_key = False
+            elif ch == "," and self._stack:
+                top = self._stack[-1]
+                if top.is_object:
+                    top.expect_key = True
+                else:
+                    top.index += 1
+        return completed
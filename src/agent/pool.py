@@ -0,0 +1,97 @@
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+
+from src.agent.agent import Agent, build_summary_completion, build_title_completion
+from src.agent.ai_completion import AICompletion
+from src.agent.tokens import count_tokens
+from src.core.config import (
+    AGENT_HTTP_KEEPALIVE_SECONDS,
+    AGENT_HTTP_MAX_CONNECTIONS,
+    AGENT_POOL_SIZE,
+)
+from src.core.metrics import Counter, Histogram
+
+POOL_ACQUIRE_SECONDS = Histogram(
+    "agent_pool_acquire_seconds",
+    "Time spent obtaining a tool-bound agent before the first LLM call",
+    labelnames=("source",),
+)
+POOL_SETUP_SAVED_SECONDS = Counter(
+    "agent_pool_setup_saved_seconds_total",
+    "Client construction and tool binding time avoided by reusing warm agents",
+)
+
+
+class AgentPool:
+    """Process-wide pool of warm, tool-bound agents.
+
+    Every agent shares one keep-alive HTTP client, so reusing an agent skips client
+    construction, tool-schema binding and the TLS handshake to the LLM provider.
+    """
+
+    def __init__(self, size: int = AGENT_POOL_SIZE):
+        self.size = size
+        self._idle: deque[Agent] = deque()
+        self._http_client: httpx.AsyncClient | None = None
+        self._title_completion: AICompletion | None = None
+        self._summary_completion: AICompletion | None = None
+        self._cold_build_seconds = 0.0
+
+    async def start(self) -> None:
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=AGENT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=AGENT_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=AGENT_HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+        self._title_completion = build_title_completion(self._http_client)
+        self._summary_completion = build_summary_completion(self._http_client)
+        # Load the tokenizer now rather than on the first chat turn
+        count_tokens("warmup")
+        build_times = []
+        for _ in range(self.size):
+            started = time.perf_counter()
+            self._idle.append(self._build())
+            build_times.append(time.perf_counter() - started)
+        if build_times:
+            self._cold_build_seconds = sum(build_times) / len(build_times)
+
+    async def close(self) -> None:
+        self._idle.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def _build(self) -> Agent:
+        return Agent(
+            http_async_client=self._http_client,
+            title_completion=self._title_completion,
+            summary_completion=self._summary_completion,
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Agent]:
+        started = time.perf_counter()
+        if self._idle:
+            agent = self._idle.pop()
+            source = "pool"
+            POOL_SETUP_SAVED_SECONDS.inc(self._cold_build_seconds)
+        else:
+            # Pool exhausted (or not started): build an overflow agent on the shared client
+            agent = self._build()
+            source = "cold"
+        POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - started, source=source)
+        try:
+            yield agent
+        finally:
+            if len(self._idle) < self.size:
+                self._idle.append(agent)
+
+
+agent_pool = AgentPool()
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import re
+
+from src.agent.tool_executor import _tool_threads
+from src.core.config import AGENT_MANUAL_PREFETCH_OVERLAP
+from src.core.metrics import Counter
+from src.manual.tool import agenerate_query_embedding, format_manual_results, search_manual_chunks
+
+logger = logging.getLogger(__name__)
+
+MANUAL_PREFETCHES = Counter(
+    "agent_manual_prefetch_total",
+    "Speculative manual lookups by outcome (hit, miss, unused, failed)",
+    labelnames=("outcome",),
+)
+
+# Words that don't change what a manual search returns
+STOP_WORDS = {
+    "a", "an", "and", "any", "are", "can", "do", "does", "for", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "please", "should", "the", "there", "this", "to",
+    "what", "when", "where", "which", "why", "with", "you", "your",
+}  # fmt: skip
+
+
+def content_words(text: str) -> set[str]:
+    return set(re.sub(r"[^\w\s]", " ", text.lower()).split()) - STOP_WORDS
+
+
+class ManualPrefetch:
+    """Manual retrieval for the user's message, started before the model asks for it.
+
+    The model usually calls search_pongbot_manual with a condensed form of the user's
+    question. When most of the words in its query come from the message, the chunks
+    retrieved for the message are answered straight away; otherwise the tool runs as
+    usual and the prefetched lookup is discarded.
+    """
+
+    def __init__(self, message: str, overlap: float = AGENT_MANUAL_PREFETCH_OVERLAP):
+        self.message = message
+        self.overlap = overlap
+        self.requested = False
+        self.used = False
+        self._words = content_words(message)
+        self._task = asyncio.create_task(self._search())
+
+    async def _search(self) -> list[dict]:
+        embedding = await agenerate_query_embedding(self.message)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_tool_threads, search_manual_chunks, embedding)
+
+    def matches(self, query: str) -> bool:
+        words = content_words(query)
+        return bool(words) and len(words & self._words) / len(words) >= self.overlap
+
+    def claim(self, query: str) -> bool:
+        """Whether a tool call for `query` can take the prefetched result."""
+        self.requested = True
+        if self.used or not self.matches(query):
+            MANUAL_PREFETCHES.inc(outcome="miss")
+            return False
+        self.used = True
+        return True
+
+    async def result(self, query: str) -> str | None:
+        """The tool result for `query`, or None to run the search normally."""
+        try:
+            results = await self._task
+        except Exception:
+            logger.warning("Manual prefetch failed; running the search normally", exc_info=True)
+            MANUAL_PREFETCHES.inc(outcome="failed")
+            return None
+        MANUAL_PREFETCHES.inc(outcome="hit")
+        return format_manual_results(query, results)
+
+    def close(self) -> None:
+        if not self.requested:
+            MANUAL_PREFETCHES.inc(outcome="unused")
+        if not self._task.done():
+            self._task.cancel()
+        elif not self._task.cancelled():
+            # Retrieve a failure nobody awaited so it isn't logged as unhandled
+            self._task.exception()
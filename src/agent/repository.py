@@ -1,9 +1,29 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 import json
 
 from src.agent.db_model import CardProgress, ContentBlock, Conversation, Message
 
+PREVIEW_LENGTH = 120
+
+
+def _touch_conversation(conversation_id: str, content: str):
+    """Counter/preview update applied in the same transaction as a message insert."""
+    return (
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            message_count=Conversation.message_count + 1,
+            last_message_at=func.now(),
+            last_message_preview=" ".join(content.split())[:PREVIEW_LENGTH],
+        )
+        .execution_options(synchronize_session=False)
+    )
+
 
 class ConversationRepository:
     def __init__(self, db: Session):
@@ -12,6 +32,12 @@ class ConversationRepository:
     def get_by_id(self, conversation_id: str) -> Conversation | None:
         return self.db.query(Conversation).filter(Conversation.id == conversation_id).first()
 
+    def get_message_count(self, conversation_id: str) -> int:
+        count = self.db.execute(
+            select(Conversation.message_count).where(Conversation.id == conversation_id)
+        ).scalar()
+        return count or 0
+
     def get_by_user_id(self, user_id: str, limit: int = 100, offset: int = 0) -> list[Conversation]:
         return (
             self.db.query(Conversation)
@@ -22,6 +48,23 @@ class ConversationRepository:
             .all()
         )
 
+    def get_page_by_user_id(
+        self, user_id: str, limit: int = 100, offset: int = 0
+    ) -> tuple[list[Conversation], int]:
+        """A page of conversations plus the total, counted in the same query."""
+        rows = (
+            self.db.query(Conversation, func.count().over())
+            .filter(Conversation.user_id == user_id, Conversation.is_deleted == False)
+            .order_by(Conversation.updated_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        if not rows:
+            # Past the last page the window count has no row to ride on
+            return [], self.count_by_user_id(user_id) if offset else 0
+        return [conversation for conversation, _ in rows], rows[0][1]
+
     def count_by_user_id(self, user_id: str) -> int:
         return (
             self.db.query(Conversation)
@@ -61,9 +104,41 @@ class MessageRepository:
             .all()
         )
 
-    def create(self, conversation_id: str, role: str, content: str) -> Message:
-        message = Message(conversation_id=conversation_id, role=role, content=content)
+    def get_with_blocks_by_conversation_id(self, conversation_id: str) -> list[Message]:
+        """Messages with their content blocks, loaded in two queries regardless of size."""
+        return (
+            self.db.query(Message)
+            .options(selectinload(Message.content_blocks))
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.asc())
+            .all()
+        )
+
+    def get_page_by_conversation_id(
+        self,
+        conversation_id: str,
+        limit: int,
+        before: tuple[datetime, str] | None = None,
+    ) -> list[Message]:
+        """Up to limit messages older than the (created_at, id) key, newest first.
+
+        Served by ix_messages_conversation_created_id, so the cost depends on the page
+        size rather than on how far back the page is.
+        """
+        query = self.db.query(Message).options(selectinload(Message.content_blocks))
+        query = query.filter(Message.conversation_id == conversation_id)
+        if before is not None:
+            query = query.filter(tuple_(Message.created_at, Message.id) < tuple_(*before))
+        return query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit).all()
+
+    def create(
+        self, conversation_id: str, role: str, content: str, token_count: int | None = None
+    ) -> Message:
+        message = Message(
+            conversation_id=conversation_id, role=role, content=content, token_count=token_count
+        )
         self.db.add(message)
+        self.db.execute(_touch_conversation(conversation_id, content))
         self.db.commit()
         self.db.refresh(message)
         return message
@@ -118,6 +193,21 @@ class CardProgressRepository:
             .first()
         )
 
+    def get_by_content_blocks_and_user(
+        self, content_block_ids: list[str], user_id: str
+    ) -> dict[str, CardProgress]:
+        if not content_block_ids:
+            return {}
+        progress = (
+            self.db.query(CardProgress)
+            .filter(
+                CardProgress.content_block_id.in_(content_block_ids),
+                CardProgress.user_id == user_id,
+            )
+            .all()
+        )
+        return {p.content_block_id: p for p in progress}
+
     def upsert(
         self, content_block_id: str, user_id: str, checked_steps: list[bool]
     ) -> CardProgress:
@@ -136,3 +226,151 @@ class CardProgressRepository:
         self.db.commit()
         self.db.refresh(progress)
         return progress
+
+
+class AsyncConversationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, conversation_id: str) -> Conversation | None:
+        return await self.db.get(Conversation, conversation_id)
+
+    async def get_message_count(self, conversation_id: str) -> int:
+        result = await self.db.execute(
+            select(Conversation.message_count).where(Conversation.id == conversation_id)
+        )
+        return result.scalar() or 0
+
+    async def create(self, user_id: str) -> Conversation:
+        conversation = Conversation(user_id=user_id)
+        self.db.add(conversation)
+        await self.db.commit()
+        await self.db.refresh(conversation)
+        return conversation
+
+    async def update_title(self, conversation: Conversation, title: str) -> Conversation:
+        conversation.title = title
+        await self.db.commit()
+        await self.db.refresh(conversation)
+        return conversation
+
+    async def update_context_summary(
+        self, conversation: Conversation, summary: str, until
+    ) -> Conversation:
+        conversation.context_summary = summary
+        conversation.context_summary_until = until
+        await self.db.commit()
+        await self.db.refresh(conversation)
+        return conversation
+
+
+class AsyncMessageRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_conversation_id(self, conversation_id: str) -> list[Message]:
+        result = await self.db.execute(
+            select(Message)
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.asc())
+        )
+        return list(result.scalars().all())
+
+    async def get_recent_by_conversation_id(
+        self, conversation_id: str, after=None, limit: int = 200
+    ) -> list[Message]:
+        """Most recent messages first (with their blocks), optionally only those after a timestamp."""
+        stmt = (
+            select(Message)
+            .options(selectinload(Message.content_blocks))
+            .filter(Message.conversation_id == conversation_id)
+        )
+        if after is not None:
+            stmt = stmt.filter(Message.created_at > after)
+        result = await self.db.execute(stmt.order_by(Message.created_at.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    async def add(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        token_count: int | None = None,
+        prompt_tokens: int | None = None,
+        completion_tokens: int | None = None,
+        ttft_ms: int | None = None,
+        duration_ms: int | None = None,
+        truncated: bool = False,
+    ) -> Message:
+        """Insert a message within the caller's transaction; the caller commits."""
+        message = Message(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            token_count=token_count,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            ttft_ms=ttft_ms,
+            duration_ms=duration_ms,
+            truncated=truncated,
+        )
+        self.db.add(message)
+        await self.db.flush([message])
+        await self.db.execute(_touch_conversation(conversation_id, content))
+        return message
+
+    async def create(self, conversation_id: str, role: str, content: str, **kwargs) -> Message:
+        message = await self.add(conversation_id, role, content, **kwargs)
+        await self.db.commit()
+        return message
+
+
+class AsyncContentBlockRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(
+        self,
+        message_id: str,
+        block_type: str,
+        content: str,
+        tool_name: str | None = None,
+        order: int = 0,
+    ) -> ContentBlock:
+        block = ContentBlock(
+            message_id=message_id,
+            type=block_type,
+            content=content,
+            tool_name=tool_name,
+            order=order,
+        )
+        self.db.add(block)
+        await self.db.commit()
+        await self.db.refresh(block)
+        return block
+
+    async def add_many(
+        self, message_id: str, blocks: list[tuple[str, str, str | None]]
+    ) -> list[str]:
+        """Insert (type, content, tool_name) blocks in one statement; returns ids in order.
+
+        Runs within the caller's transaction; the caller commits.
+        """
+        if not blocks:
+            return []
+        rows = [
+            {
+                "message_id": message_id,
+                "type": block_type,
+                "content": content,
+                "tool_name": tool_name,
+                "order": order,
+            }
+            for order, (block_type, content, tool_name) in enumerate(blocks)
+        ]
+        result = await self.db.execute(
+            insert(ContentBlock).values(rows).returning(ContentBlock.id, ContentBlock.order)
+        )
+        # Multi-row RETURNING order isn't guaranteed, so map back through the order column
+        ids = {order: block_id for block_id, order in result.all()}
+        return [ids[order] for order in range(len(blocks))]
@@ -1,26 +1,66 @@
 import json
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    Cookie,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.agent.agent import Agent
+from src.agent.admission import AdmissionRejectedError, admit_turn
 from src.agent.models import (
     CardProgressResponse,
     CardProgressUpdate,
     ChatRequest,
     ConversationDetail,
     ConversationResponse,
+    MessageResponse,
 )
-from src.agent.service import AgentService
-from src.core.database import get_db
-from src.core.models import DeleteResponse, PagedResponse
+from src.agent.service import AgentService, AsyncAgentService
+from src.agent.stream_buffer import STREAM_RESUMES, EventsExpiredError, TurnStream, stream_buffer
+from src.agent.turn import start_turn
+from src.agent.websocket import ChatConnection, authenticate
+from src.core.database import get_async_db, get_db
+from src.core.models import CursorPage, DeleteResponse, PagedResponse
 from src.core.security import get_current_user
 from src.user.db_model import User as DBUser
 
 router = APIRouter(prefix="/api/v1/agent", tags=["agent"])
 
 
+def _sse_response(turn: TurnStream, after: int = 0) -> StreamingResponse:
+    async def relay():
+        try:
+            async for seq, event in turn.follow(after):
+                yield f"id: {turn.event_id(seq)}\ndata: {json.dumps(event)}\n\n"
+        except EventsExpiredError:
+            # A slow reader fell behind the ring buffer; the client resumes from the DB
+            expired = json.dumps({
+                "type": "error",
+                "code": "stream_expired",
+                "conversation_id": turn.conversation_id,
+            })
+            yield f"data: {expired}\n\n"
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/conversations", response_model=PagedResponse[ConversationResponse])
 def list_conversations(
     limit: int = 100,
@@ -61,6 +101,27 @@ def get_conversation(
     return detail
 
 
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=CursorPage[MessageResponse],
+)
+def get_conversation_messages(
+    conversation_id: str,
+    limit: int = Query(default=30, ge=1, le=200),
+    before: str | None = Query(default=None, description="next_cursor from the previous page"),
+    current_user: DBUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    service = AgentService(db)
+    try:
+        page = service.get_messages_page(conversation_id, current_user.id, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    if not page:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return page
+
+
 @router.delete("/conversations/{conversation_id}", response_model=DeleteResponse)
 def delete_conversation(
     conversation_id: str,
@@ -79,106 +140,86 @@ def delete_conversation(
 async def chat_stream(
     request: ChatRequest,
     current_user: DBUser = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    service = AgentService(db)
+    try:
+        ticket = admit_turn(current_user.id)
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        ) from None
 
-    # Create or retrieve conversation
-    conversation_id = request.conversation_id
-    if not conversation_id:
-        conversation = service.create_conversation(current_user.id)
-        conversation_id = conversation.id
-    else:
-        conversation = service.get_conversation(conversation_id, current_user.id)
-        if not conversation:
-            raise HTTPException(status_code=404, detail="Conversation not found")
-
-    # Save user message
-    service.add_message(conversation_id, "user", request.message)
-
-    # Check if this is the first message (for title generation)
-    should_generate_title = service.is_first_message(conversation_id)
-
-    # Build conversation history
-    conversation_history = [
-        {"role": msg.role, "content": msg.content} for msg in request.conversation_history
-    ]
-
-    agent = Agent()
-
-    async def generate():
-        # Track blocks in chronological order
-        content_blocks = []  # List of (type, content, tool_name) tuples
-        current_text = ""
-        all_text = ""  # For message.content
-
-        async for event in agent.run(
-            message=request.message,
-            conversation_history=conversation_history,
-        ):
-            yield f"data: {json.dumps({**event, 'conversation_id': conversation_id})}\n\n"
-
-            # Build blocks in chronological order
-            if event["type"] == "text_delta":
-                current_text += event["content"]
-                all_text += event["content"]
-            elif event["type"] == "tool_use_end":
-                # Save accumulated text as a block before the tool use
-                if current_text:
-                    content_blocks.append(("text", current_text, None))
-                    current_text = ""
-                # Save tool use block
-                content_blocks.append(("tool_use", event.get("result", ""), event.get("tool")))
-
-        # Save any remaining text after the last tool use
-        if current_text:
-            content_blocks.append(("text", current_text, None))
-
-        # Save assistant message with content blocks in order
-        msg = service.add_message(conversation_id, "assistant", all_text)
-
-        for order, (block_type, content, tool_name) in enumerate(content_blocks):
-            block = service.add_content_block(
-                msg.id,
-                block_type,
-                content,
-                tool_name=tool_name,
-                order=order,
-            )
-
-            # Emit card_saved for tool_use blocks
-            if block_type == "tool_use":
-                card_saved = json.dumps({
-                    "type": "card_saved",
-                    "content_block_id": block.id,
-                    "tool": tool_name,
-                    "result": content,
-                    "conversation_id": conversation_id,
-                })
-                yield f"data: {card_saved}\n\n"
-
-        # Generate title for first message
-        title = None
-        if should_generate_title:
-            title = await agent.generate_title(request.message)
-            service.update_title(conversation_id, title)
-
-        done_data = json.dumps({
-            "type": "done",
-            "conversation_id": conversation_id,
-            "title": title,
-        })
-        yield f"data: {done_data}\n\n"
+    service = AsyncAgentService(db)
 
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    # Create or retrieve conversation; the ticket goes back if that fails in any way
+    try:
+        if not request.conversation_id:
+            conversation = await service.create_conversation(current_user.id)
+        else:
+            conversation = await service.get_conversation(request.conversation_id, current_user.id)
+    except BaseException:
+        ticket.release()
+        raise
+    if not conversation:
+        ticket.release()
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    turn = start_turn(ticket, conversation, current_user.id, request.message)
+    return _sse_response(turn)
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket, token: str | None = Cookie(None)):
+    """Chat over one WebSocket: concurrent turns, cancellation and heartbeats.
+
+    Authenticates once per connection (session cookie, or a first {"type": "auth"}
+    frame) and streams the same events as POST /chat, tagged with the request_id of
+    the chat frame that started the turn.
+    """
+    await websocket.accept()
+    try:
+        user = await authenticate(websocket, token)
+    except WebSocketDisconnect:
+        return
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated")
+        return
+    await ChatConnection(websocket, user).serve()
+
+
+@router.get("/conversations/{conversation_id}/stream")
+async def resume_chat_stream(
+    conversation_id: str,
+    last_event_id: str | None = Header(default=None),
+    current_user: DBUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Reattach to a turn's stream after a dropped connection.
+
+    Replays the events after Last-Event-ID and then follows the live turn. Without the
+    header, the conversation's latest turn is replayed from the start.
+    """
+    if not await AsyncAgentService(db).get_conversation(conversation_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    after = 0
+    if last_event_id:
+        turn_id, _, seq = last_event_id.partition(":")
+        if not seq.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+        turn = stream_buffer.get(conversation_id, turn_id)
+        after = int(seq)
+    else:
+        turn = stream_buffer.latest(conversation_id)
+
+    if not turn:
+        STREAM_RESUMES.inc(outcome="missing")
+        raise HTTPException(status_code=404, detail="No buffered stream for this conversation")
+    if not turn.can_resume(after):
+        STREAM_RESUMES.inc(outcome="expired")
+        raise HTTPException(status_code=410, detail="Stream events are no longer buffered")
+    STREAM_RESUMES.inc(outcome="replayed" if turn.finished else "attached")
+    return _sse_response(turn, after)
 
 
 @router.put("/cards/{content_block_id}/progress", response_model=CardProgressResponse)
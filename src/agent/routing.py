@@ -0,0 +1,104 @@
+import logging
+import re
+from dataclasses import dataclass
+
+from src.agent.prompts import MANUAL_WORDS, SMALL_TALK, TRAINING, classify_intent
+from src.agent.telemetry import TurnStats
+from src.core.config import AGENT_FAST_MODEL_MAX_CHARS
+from src.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+DEFAULT = "default"
+
+ROUTE_DECISIONS = Counter(
+    "agent_route_decisions_total",
+    "Chat turns by model route and the reason for it",
+    labelnames=("route", "reason"),
+)
+ROUTE_TTFT_SECONDS = Histogram(
+    "agent_route_ttft_seconds", "Time to first token by model route", labelnames=("route",)
+)
+
+# Requests that end in a generated session or a manual lookup stay on the large model
+TOOL_WORDS = MANUAL_WORDS | {
+    "session", "sessions", "drill", "drills", "workout", "plan", "routine", "practice",
+    "practise", "train", "training", "exercise", "exercises", "harder", "easier",
+    "generate", "create", "build", "make", "design", "machine", "settings", "setting",
+}  # fmt: skip
+QUESTION_WORDS = {
+    "how", "what", "why", "when", "which", "should", "can", "could", "is", "are", "does",
+    "do",
+}  # fmt: skip
+
+# Exponential moving average weight for the per-route latency baselines
+LATENCY_SMOOTHING = 0.1
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    reason: str
+
+
+def route_turn(message: str, conversation_history: list[dict]) -> Route:
+    """Pick the model for a turn from the message alone, before any LLM call.
+
+    Greetings and short, self-contained technique questions go to the fast model;
+    anything that may need a tool, answers an offer from the previous reply, or
+    doesn't clearly fit either gets the default model.
+    """
+    intent = classify_intent(message)
+    if intent == SMALL_TALK:
+        return Route(FAST, "small_talk")
+    if intent != TRAINING:
+        return Route(DEFAULT, intent)
+
+    words = re.findall(r"[a-z]+", message.lower())
+    if set(words) & TOOL_WORDS:
+        return Route(DEFAULT, "tool_words")
+    if len(message) > AGENT_FAST_MODEL_MAX_CHARS:
+        return Route(DEFAULT, "long")
+    if conversation_history:
+        last = conversation_history[-1]
+        # "What about padel?" after "Want me to build a session?" still needs the tools
+        if last.get("role") == "assistant" and last.get("content", "").rstrip().endswith("?"):
+            return Route(DEFAULT, "reply_to_offer")
+    if words and words[0] in QUESTION_WORDS:
+        return Route(FAST, "technique_question")
+    return Route(DEFAULT, "unclassified")
+
+
+class RouteLatency:
+    """Running time-to-first-token per route, for logging how much routing saves."""
+
+    def __init__(self, smoothing: float = LATENCY_SMOOTHING):
+        self.smoothing = smoothing
+        self._ttft_ms: dict[str, float] = {}
+
+    def record(self, stats: TurnStats) -> None:
+        ROUTE_DECISIONS.inc(route=stats.route, reason=stats.route_reason)
+        ttft_ms = stats.ttft_ms
+        if ttft_ms is None:
+            logger.info("Route %s (%s) on %s: no tokens", stats.route, stats.route_reason, stats.model)
+            return
+        ROUTE_TTFT_SECONDS.observe(ttft_ms / 1000, route=stats.route)
+        baseline = self._ttft_ms.get(DEFAULT)
+        delta = f"{ttft_ms - baseline:+.0f}ms vs default" if baseline is not None else "no baseline"
+        logger.info(
+            "Route %s (%s) on %s: ttft %dms (%s), total %sms",
+            stats.route,
+            stats.route_reason,
+            stats.model,
+            ttft_ms,
+            delta,
+            stats.duration_ms,
+        )
+        previous = self._ttft_ms.get(stats.route)
+        self._ttft_ms[stats.route] = (
+            ttft_ms if previous is None else previous + self.smoothing * (ttft_ms - previous)
+        )
+
+
+route_latency = RouteLatency()
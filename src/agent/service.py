@@ -1,8 +1,12 @@
+import base64
 import json
+from datetime import datetime
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.agent.db_model import CardProgress, ContentBlock, Conversation, Message
+from src.agent.drill_codec import compact_drills_in_text
 from src.agent.models import (
     CardProgressResponse,
     ContentBlockResponse,
@@ -11,11 +15,30 @@ from src.agent.models import (
     MessageResponse,
 )
 from src.agent.repository import (
+    AsyncContentBlockRepository,
+    AsyncConversationRepository,
+    AsyncMessageRepository,
     CardProgressRepository,
     ContentBlockRepository,
     ConversationRepository,
     MessageRepository,
 )
+from src.agent.telemetry import TurnStats
+from src.agent.tokens import count_tokens
+from src.core.models import CursorPage
+
+
+def encode_message_cursor(message: Message) -> str:
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_message_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), message_id
+    except ValueError:
+        raise ValueError("Invalid cursor") from None
 
 
 class AgentService:
@@ -32,9 +55,7 @@ class AgentService:
     def get_conversations(
         self, user_id: str, limit: int = 100, offset: int = 0
     ) -> tuple[list[Conversation], int]:
-        conversations = self.conversation_repo.get_by_user_id(user_id, limit, offset)
-        total = self.conversation_repo.count_by_user_id(user_id)
-        return conversations, total
+        return self.conversation_repo.get_page_by_user_id(user_id, limit, offset)
 
     def get_conversation(self, conversation_id: str, user_id: str) -> Conversation | None:
         conversation = self.conversation_repo.get_by_id(conversation_id)
@@ -48,13 +69,46 @@ class AgentService:
         conversation = self.get_conversation(conversation_id, user_id)
         if not conversation:
             return None
-        messages = self.message_repo.get_by_conversation_id(conversation_id)
+        # Set-based loading: messages, their blocks and the user's card progress
+        # take a constant number of queries however long the conversation is
+        messages = self.message_repo.get_with_blocks_by_conversation_id(conversation_id)
+        tool_block_ids = [
+            b.id for m in messages for b in m.content_blocks if b.type == "tool_use"
+        ]
+        progress = self.card_progress_repo.get_by_content_blocks_and_user(tool_block_ids, user_id)
         return ConversationDetail(
             id=conversation.id,
             title=conversation.title,
             created_at=conversation.created_at.isoformat() if conversation.created_at else "",
             updated_at=conversation.updated_at.isoformat() if conversation.updated_at else "",
-            messages=[self._message_to_pydantic(m, user_id) for m in messages],
+            message_count=conversation.message_count or 0,
+            messages=[self._message_to_pydantic(m, progress) for m in messages],
+        )
+
+    def get_messages_page(
+        self, conversation_id: str, user_id: str, limit: int, before: str | None = None
+    ) -> CursorPage[MessageResponse] | None:
+        """One page of messages ending just before the cursor (latest page without one).
+
+        Messages are returned oldest first so clients can prepend the page as is.
+        """
+        conversation = self.get_conversation(conversation_id, user_id)
+        if not conversation:
+            return None
+        key = decode_message_cursor(before) if before else None
+        # Fetch one extra row to learn whether an older page exists
+        messages = self.message_repo.get_page_by_conversation_id(conversation_id, limit + 1, key)
+        has_more = len(messages) > limit
+        messages = list(reversed(messages[:limit]))
+        tool_block_ids = [
+            b.id for m in messages for b in m.content_blocks if b.type == "tool_use"
+        ]
+        progress = self.card_progress_repo.get_by_content_blocks_and_user(tool_block_ids, user_id)
+        return CursorPage[MessageResponse](
+            data=[self._message_to_pydantic(m, progress) for m in messages],
+            limit=limit,
+            next_cursor=encode_message_cursor(messages[0]) if has_more else None,
+            has_more=has_more,
         )
 
     def delete_conversation(self, conversation_id: str, user_id: str) -> None:
@@ -64,7 +118,7 @@ class AgentService:
         self.conversation_repo.soft_delete(conversation)
 
     def add_message(self, conversation_id: str, role: str, content: str) -> Message:
-        return self.message_repo.create(conversation_id, role, content)
+        return self.message_repo.create(conversation_id, role, content, count_tokens(content))
 
     def add_content_block(
         self,
@@ -91,8 +145,7 @@ class AgentService:
             self.conversation_repo.update_title(conversation, title)
 
     def is_first_message(self, conversation_id: str) -> bool:
-        messages = self.message_repo.get_by_conversation_id(conversation_id)
-        return len(messages) <= 1
+        return self.conversation_repo.get_message_count(conversation_id) <= 1
 
     def conversation_to_pydantic(self, conversation: Conversation) -> ConversationResponse:
         return ConversationResponse(
@@ -100,26 +153,33 @@ class AgentService:
             title=conversation.title,
             created_at=conversation.created_at.isoformat() if conversation.created_at else "",
             updated_at=conversation.updated_at.isoformat() if conversation.updated_at else "",
+            message_count=conversation.message_count or 0,
+            last_message_at=(
+                conversation.last_message_at.isoformat() if conversation.last_message_at else None
+            ),
+            last_message_preview=conversation.last_message_preview,
         )
 
-    def _message_to_pydantic(self, message: Message, user_id: str) -> MessageResponse:
-        content_blocks = self.content_block_repo.get_by_message_id(message.id)
+    def _message_to_pydantic(
+        self, message: Message, progress: dict[str, CardProgress]
+    ) -> MessageResponse:
         return MessageResponse(
             id=message.id,
             role=message.role,
             content=message.content,
             created_at=message.created_at.isoformat() if message.created_at else "",
-            content_blocks=[self._content_block_to_pydantic(b, user_id) for b in content_blocks],
+            truncated=bool(message.truncated),
+            content_blocks=[
+                self._content_block_to_pydantic(b, progress) for b in message.content_blocks
+            ],
         )
 
     def _content_block_to_pydantic(
-        self, block: ContentBlock, user_id: str
+        self, block: ContentBlock, progress: dict[str, CardProgress]
     ) -> ContentBlockResponse:
         checked_steps = None
-        if block.type == "tool_use":
-            progress = self.card_progress_repo.get_by_content_block_and_user(block.id, user_id)
-            if progress:
-                checked_steps = json.loads(progress.checked_steps)
+        if block.type == "tool_use" and block.id in progress:
+            checked_steps = json.loads(progress[block.id].checked_steps)
         return ContentBlockResponse(
             id=block.id,
             type=block.type,
@@ -128,3 +188,103 @@ class AgentService:
             order=block.order,
             checked_steps=checked_steps,
         )
+
+
+class AsyncAgentService:
+    """Async counterpart of AgentService for the streaming chat path.
+
+    Runs on asyncpg so persisting a turn never blocks the event loop that serves
+    other users' SSE streams.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.conversation_repo = AsyncConversationRepository(db)
+        self.message_repo = AsyncMessageRepository(db)
+        self.content_block_repo = AsyncContentBlockRepository(db)
+        self.db = db
+
+    async def create_conversation(self, user_id: str) -> Conversation:
+        return await self.conversation_repo.create(user_id)
+
+    async def get_conversation(self, conversation_id: str, user_id: str) -> Conversation | None:
+        conversation = await self.conversation_repo.get_by_id(conversation_id)
+        if conversation and conversation.user_id == user_id and not conversation.is_deleted:
+            return conversation
+        return None
+
+    async def add_message(
+        self, conversation_id: str, role: str, content: str, stats: TurnStats | None = None
+    ) -> Message:
+        return await self.message_repo.create(
+            conversation_id, role, content, **self._message_fields(content, stats)
+        )
+
+    async def save_assistant_turn(
+        self,
+        conversation_id: str,
+        content: str,
+        blocks: list[tuple[str, str, str | None]],
+        stats: TurnStats | None = None,
+        truncated: bool = False,
+    ) -> tuple[Message, list[str]]:
+        """Persist an assistant message and its (type, content, tool_name) blocks atomically.
+
+        One transaction: the message insert, the conversation counter update and a single
+        multi-row block insert, instead of a commit and refresh per block.
+        Returns the message and the generated block ids in block order.
+        """
+        message = await self.message_repo.add(
+            conversation_id,
+            "assistant",
+            content,
+            truncated=truncated,
+            **self._message_fields(content, stats),
+        )
+        block_ids = await self.content_block_repo.add_many(message.id, blocks)
+        await self.db.commit()
+        return message, block_ids
+
+    @staticmethod
+    def _message_fields(content: str, stats: TurnStats | None) -> dict:
+        # Counted as the model sees it, with any drill JSON in its compact encoding
+        fields = {"token_count": count_tokens(compact_drills_in_text(content))}
+        if stats is not None:
+            fields.update(
+                prompt_tokens=stats.prompt_tokens if stats.llm_calls else None,
+                completion_tokens=stats.completion_tokens if stats.llm_calls else None,
+                ttft_ms=stats.ttft_ms,
+                duration_ms=stats.duration_ms,
+            )
+        return fields
+
+    async def get_context_messages(
+        self, conversation_id: str, after=None, limit: int = 200
+    ) -> list[Message]:
+        return await self.message_repo.get_recent_by_conversation_id(
+            conversation_id, after, limit
+        )
+
+    async def update_context_summary(self, conversation_id: str, summary: str, until) -> None:
+        conversation = await self.conversation_repo.get_by_id(conversation_id)
+        if conversation:
+            await self.conversation_repo.update_context_summary(conversation, summary, until)
+
+    async def add_content_block(
+        self,
+        message_id: str,
+        block_type: str,
+        content: str,
+        tool_name: str | None = None,
+        order: int = 0,
+    ) -> ContentBlock:
+        return await self.content_block_repo.create(
+            message_id, block_type, content, tool_name, order
+        )
+
+    async def update_title(self, conversation_id: str, title: str) -> None:
+        conversation = await self.conversation_repo.get_by_id(conversation_id)
+        if conversation:
+            await self.conversation_repo.update_title(conversation, title)
+
+    async def is_first_message(self, conversation_id: str) -> bool:
+        return await self.conversation_repo.get_message_count(conversation_id) <= 1
@@ -0,0 +1,183 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+
+from src.core.config import (
+    AGENT_DISCONNECT_GRACE_SECONDS,
+    AGENT_STREAM_BUFFER_EVENTS,
+    AGENT_STREAM_BUFFER_MAX_TURNS,
+    AGENT_STREAM_RETENTION_SECONDS,
+)
+from src.core.metrics import Counter
+
+STREAM_RESUMES = Counter(
+    "agent_stream_resumes_total", "Reconnects to a buffered chat stream", labelnames=("outcome",)
+)
+
+
+class EventsExpiredError(Exception):
+    """The events a reader asked for have already been evicted from the buffer."""
+
+
+class TurnStream:
+    """Events of one chat turn, numbered from 1, kept in a bounded ring buffer.
+
+    The turn's producer appends events and finishes the stream; any number of readers
+    can follow it, each picking up after the last sequence number it saw. When nobody
+    has been following for `abandon_after` seconds, or a client cancels the turn,
+    `on_cancel` is called.
+    """
+
+    def __init__(
+        self,
+        conversation_id: str,
+        user_id: str,
+        max_events: int,
+        abandon_after: float = AGENT_DISCONNECT_GRACE_SECONDS,
+    ):
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+        self.turn_id = uuid.uuid4().hex
+        self.last_seq = 0
+        self.finished_at: float | None = None
+        self.readers = 0
+        self.on_cancel: Callable[[], None] | None = None
+        self._events: deque[dict] = deque(maxlen=max_events)
+        self._signal = asyncio.Event()
+        self._abandon_after = abandon_after
+        self._abandon_timer: asyncio.TimerHandle | None = None
+        # Covers a client that goes away before it starts reading
+        self._arm_abandon_timer()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def first_seq(self) -> int:
+        return self.last_seq - len(self._events) + 1
+
+    def event_id(self, seq: int) -> str:
+        """SSE id for an event; clients send it back as Last-Event-ID."""
+        return f"{self.turn_id}:{seq}"
+
+    def append(self, event: dict) -> int:
+        self._events.append(event)
+        self.last_seq += 1
+        self._wake()
+        return self.last_seq
+
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+        self._disarm_abandon_timer()
+        self._wake()
+
+    def cancel(self) -> None:
+        """Stop the turn early; whatever it produced so far is kept as a truncated answer."""
+        if not self.finished and self.on_cancel:
+            self.on_cancel()
+
+    def can_resume(self, after: int) -> bool:
+        return after + 1 >= self.first_seq
+
+    def _arm_abandon_timer(self) -> None:
+        if self._abandon_after > 0 and self._abandon_timer is None:
+            self._abandon_timer = asyncio.get_running_loop().call_later(
+                self._abandon_after, self._check_abandoned
+            )
+
+    def _disarm_abandon_timer(self) -> None:
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+
+    def _check_abandoned(self) -> None:
+        self._abandon_timer = None
+        if self.readers == 0:
+            self.cancel()
+
+    def _wake(self) -> None:
+        signal, self._signal = self._signal, asyncio.Event()
+        signal.set()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[tuple[int, dict]]:
+        """Yield (seq, event) for every event after `after`, live until the turn finishes."""
+        self.readers += 1
+        self._disarm_abandon_timer()
+        try:
+            while True:
+                signal = self._signal
+                while after < self.last_seq:
+                    if not self.can_resume(after):
+                        raise EventsExpiredError(f"Events after {after} are no longer buffered")
+                    after += 1
+                    yield after, self._events[after - self.first_seq]
+                if self.finished:
+                    return
+                await signal.wait()
+        finally:
+            self.readers -= 1
+            if self.readers == 0 and not self.finished:
+                self._arm_abandon_timer()
+
+
+class StreamBuffer(ABC):
+    """Registry of in-flight and recently finished turns, keyed by conversation and turn."""
+
+    @abstractmethod
+    def open(self, conversation_id: str, user_id: str) -> TurnStream: ...
+
+    @abstractmethod
+    def get(self, conversation_id: str, turn_id: str) -> TurnStream | None: ...
+
+    @abstractmethod
+    def latest(self, conversation_id: str) -> TurnStream | None: ...
+
+
+class InMemoryStreamBuffer(StreamBuffer):
+    """Per-process buffer. Resuming requires reaching the worker that runs the turn."""
+
+    def __init__(
+        self,
+        max_events: int = AGENT_STREAM_BUFFER_EVENTS,
+        max_turns: int = AGENT_STREAM_BUFFER_MAX_TURNS,
+        retention_seconds: float = AGENT_STREAM_RETENTION_SECONDS,
+    ):
+        self.max_events = max_events
+        self.max_turns = max_turns
+        self.retention_seconds = retention_seconds
+        self._turns: OrderedDict[tuple[str, str], TurnStream] = OrderedDict()
+        self._latest: dict[str, str] = {}
+
+    def open(self, conversation_id: str, user_id: str) -> TurnStream:
+        self._prune()
+        turn = TurnStream(conversation_id, user_id, self.max_events)
+        self._turns[(conversation_id, turn.turn_id)] = turn
+        self._latest[conversation_id] = turn.turn_id
+        return turn
+
+    def get(self, conversation_id: str, turn_id: str) -> TurnStream | None:
+        return self._turns.get((conversation_id, turn_id))
+
+    def latest(self, conversation_id: str) -> TurnStream | None:
+        turn_id = self._latest.get(conversation_id)
+        return self.get(conversation_id, turn_id) if turn_id else None
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        overflow = len(self._turns) - self.max_turns + 1
+        # Oldest first; turns still running are never dropped
+        for key, turn in list(self._turns.items()):
+            if not turn.finished:
+                continue
+            if overflow > 0 or now - turn.finished_at > self.retention_seconds:
+                del self._turns[key]
+                overflow -= 1
+                if self._latest.get(turn.conversation_id) == turn.turn_id:
+                    del self._latest[turn.conversation_id]
+
+
+stream_buffer: StreamBuffer = InMemoryStreamBuffer()
@@ -0,0 +1,97 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from src.core.metrics import Histogram
+
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+TTFT_SECONDS = Histogram(
+    "agent_ttft_seconds", "Time from turn start to the first streamed token", labelnames=("model",)
+)
+TURN_SECONDS = Histogram(
+    "agent_turn_seconds", "End-to-end duration of an agent turn", labelnames=("model",)
+)
+TOKENS_PER_SECOND = Histogram(
+    "agent_tokens_per_second",
+    "Completion tokens per second after the first token",
+    labelnames=("model",),
+    buckets=(5, 10, 20, 40, 60, 80, 100, 150, 200, 400),
+)
+PROMPT_TOKENS = Histogram(
+    "agent_prompt_tokens", "Prompt tokens per turn", labelnames=("model",), buckets=TOKEN_BUCKETS
+)
+COMPLETION_TOKENS = Histogram(
+    "agent_completion_tokens",
+    "Completion tokens per turn",
+    labelnames=("model",),
+    buckets=TOKEN_BUCKETS,
+)
+TOOL_SECONDS = Histogram("agent_tool_seconds", "Tool execution time", labelnames=("tool",))
+PHASE_SECONDS = Histogram(
+    "agent_phase_seconds", "Time spent in a phase of a chat turn", labelnames=("phase",)
+)
+
+
+@dataclass
+class TurnStats:
+    """Timing and token usage captured over one chat turn."""
+
+    model: str = ""
+    # Set when the turn was routed between the default and fast models
+    route: str = ""
+    route_reason: str = ""
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    finished_at: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_calls: int = 0
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def mark_first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def add_usage(self, usage: dict | None) -> None:
+        if usage:
+            self.prompt_tokens += usage.get("input_tokens", 0)
+            self.completion_tokens += usage.get("output_tokens", 0)
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Time a phase of the turn (e.g. tools, db, title); repeated phases accumulate."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+            PHASE_SECONDS.observe(elapsed, phase=phase)
+
+    @property
+    def ttft_ms(self) -> int | None:
+        if self.first_token_at is None:
+            return None
+        return int((self.first_token_at - self.started_at) * 1000)
+
+    @property
+    def duration_ms(self) -> int | None:
+        if self.finished_at is None:
+            return None
+        return int((self.finished_at - self.started_at) * 1000)
+
+    def finish(self) -> None:
+        """Close the turn and publish its histograms."""
+        self.finished_at = time.perf_counter()
+        model = self.model or "unknown"
+        TURN_SECONDS.observe(self.finished_at - self.started_at, model=model)
+        if self.first_token_at is not None:
+            TTFT_SECONDS.observe(self.first_token_at - self.started_at, model=model)
+            generation_seconds = self.finished_at - self.first_token_at
+            if self.completion_tokens and generation_seconds > 0:
+                TOKENS_PER_SECOND.observe(self.completion_tokens / generation_seconds, model=model)
+        if self.llm_calls:
+            PROMPT_TOKENS.observe(self.prompt_tokens, model=model)
+            COMPLETION_TOKENS.observe(self.completion_tokens, model=model)
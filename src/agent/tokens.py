@@ -0,0 +1,28 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Encoding used by the gpt-4o model family
+TOKEN_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception:
+        logger.warning("tiktoken encoding unavailable, falling back to estimated token counts")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count model tokens in text, estimating ~4 characters per token without tiktoken."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
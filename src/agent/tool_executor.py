@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncGenerator, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from langchain_core.tools import BaseTool
+
+from src.agent.telemetry import TOOL_SECONDS
+from src.core.config import AGENT_TOOL_THREADS, AGENT_TOOL_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Shared by every agent in the process so blocking tools can't exhaust worker threads
+_tool_threads = ThreadPoolExecutor(max_workers=AGENT_TOOL_THREADS, thread_name_prefix="agent-tool")
+
+
+@dataclass
+class ToolResult:
+    id: str
+    name: str
+    content: str
+    is_error: bool = False
+
+
+class ToolExecutor:
+    """Runs the tool calls of one model turn concurrently, off the event loop.
+
+    Native async tools are awaited directly; sync tools run on a bounded thread pool.
+    Results are yielded in the order the model issued the calls, regardless of which
+    finishes first. A call can be answered by an already running lookup instead: a
+    prefetched awaitable that returns None falls back to running the tool.
+    """
+
+    def __init__(self, tools: list[BaseTool], timeouts: dict[str, float] | None = None):
+        self.tool_map = {t.name: t for t in tools}
+        self.timeouts = timeouts or {}
+
+    async def _invoke(self, tool: BaseTool, args: dict) -> str:
+        if getattr(tool, "coroutine", None) is not None:
+            return await tool.ainvoke(args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_tool_threads, tool.invoke, args)
+
+    async def _resolve(
+        self, tool: BaseTool, args: dict, prefetched: Awaitable[str | None] | None
+    ) -> str:
+        if prefetched is not None:
+            content = await prefetched
+            if content is not None:
+                return content
+        return await self._invoke(tool, args)
+
+    async def execute(
+        self, tool_call: dict, prefetched: Awaitable[str | None] | None = None
+    ) -> ToolResult:
+        name = tool_call["name"]
+        started = time.perf_counter()
+        try:
+            return await self._execute(tool_call, prefetched)
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - started, tool=name)
+
+    async def _execute(
+        self, tool_call: dict, prefetched: Awaitable[str | None] | None = None
+    ) -> ToolResult:
+        name = tool_call["name"]
+        tool = self.tool_map[name]
+        timeout = self.timeouts.get(name, AGENT_TOOL_TIMEOUT_SECONDS)
+        try:
+            content = await asyncio.wait_for(
+                self._resolve(tool, tool_call["args"], prefetched), timeout
+            )
+            return ToolResult(id=tool_call["id"], name=name, content=content)
+        except TimeoutError:
+            logger.warning("Tool %s timed out after %.1fs", name, timeout)
+            error = f"{name} timed out after {timeout:g}s"
+        except Exception as e:
+            logger.exception("Tool %s failed", name)
+            error = f"{name} failed: {e}"
+        return ToolResult(
+            id=tool_call["id"],
+            name=name,
+            content=json.dumps({"error": error}),
+            is_error=True,
+        )
+
+    async def execute_all(
+        self,
+        tool_calls: list[dict],
+        prefetched: dict[str, Awaitable[str | None]] | None = None,
+    ) -> AsyncGenerator[ToolResult, None]:
+        prefetched = prefetched or {}
+        # Unknown tools are skipped, matching what the model can see in its tool list
+        tasks = [
+            asyncio.create_task(self.execute(tool_call, prefetched.get(tool_call["id"])))
+            for tool_call in tool_calls
+            if tool_call["name"] in self.tool_map
+        ]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
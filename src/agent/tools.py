@@ -2,7 +2,10 @@ import json
 import uuid
 
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+
+from src.agent.drill_repair import repair_drill, repair_plan, repair_session
+from src.agent.partial_json import IncrementalJsonScanner
 
 
 # Play8 PongBot Pace S Series training card schemas for Tennis & Padel
@@ -132,7 +135,7 @@ def generate_training_session(session: TrainingSession) -> str:
     Notice: ALL 7 fields present for each ball. Never omit any field!
 
     **IMPORTANT - Explain drill logic in text:**
-    After calling this tool, your text response should explain:
+    Before calling this tool, your text response should explain:
     - WHY you designed the drill this way (tactical purpose)
     - WHAT the player should focus on (technique points)
     - HOW the drill progression works (why this sequence)
@@ -140,6 +143,7 @@ def generate_training_session(session: TrainingSession) -> str:
     Keep it motivating and coach-like, but include these educational insights!"""
     # Auto-generate training_plan_id and ensure consistency
     result = session.model_dump()
+    repair_session(result)
     training_plan_id = result['plan']['training_plan_id']
 
     # Ensure all drills use the same ID
@@ -147,3 +151,67 @@ def generate_training_session(session: TrainingSession) -> str:
         drill['training_plan_id'] = training_plan_id
 
     return json.dumps(result)
+
+
+def summarize_training_session(result: str) -> str:
+    """Compact stand-in for a generated session when the model needs to see the result."""
+    session = json.loads(result)
+    plan = session["plan"]
+    drills = ", ".join(
+        f"{d['drill_number']}. {d['title']} ({d['duration']})" for d in session["drills"]
+    )
+    return json.dumps({
+        "id": plan["training_plan_id"],
+        "status": "Training session shown to the player as cards",
+        "summary": (
+            f"{plan['title']}: {plan['sport']}, {plan['difficulty']}, "
+            f"{plan['total_duration']}. Drills: {drills}"
+        ),
+    })
+
+
+class TrainingSessionStream:
+    """Emits plan and drill cards from streamed generate_training_session arguments.
+
+    Each card is repaired, validated and emitted as soon as its JSON object is complete,
+    so the client can render the session progressively instead of waiting for the whole
+    call.
+    """
+
+    def __init__(self):
+        self.scanner = IncrementalJsonScanner()
+        self.training_plan_id: str | None = None
+        self.sport = "tennis"
+
+    def feed(self, args_chunk: str) -> list[dict]:
+        events = []
+        for path, raw in self.scanner.feed(args_chunk):
+            try:
+                if path == ("session", "plan"):
+                    data = json.loads(raw)
+                    repair_plan(data)
+                    plan = TrainingPlanCard.model_validate(data)
+                    self.training_plan_id = plan.training_plan_id
+                    self.sport = plan.sport
+                    events.append({"type": "plan_ready", "plan": plan.model_dump()})
+                elif len(path) == 3 and path[:2] == ("session", "drills"):
+                    data = json.loads(raw)
+                    repair_drill(data, self.sport, drill_number=path[2] + 1)
+                    drill = DrillCard.model_validate(data)
+                    if self.training_plan_id:
+                        drill.training_plan_id = self.training_plan_id
+                    events.append({
+                        "type": "drill_ready",
+                        "index": path[2],
+                        "drill": drill.model_dump(),
+                    })
+            except (ValidationError, ValueError, AttributeError):
+                # Incomplete or invalid card; the final tool result is authoritative
+                continue
+        return events
+
+    def apply_to_args(self, args: dict) -> None:
+        """Keep the final session's plan ID equal to the one already streamed to the client."""
+        plan = args.get("session", {}).get("plan")
+        if self.training_plan_id and isinstance(plan, dict):
+            plan.setdefault("training_plan_id", self.training_plan_id)
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from src.agent.admission import Ticket
+from src.agent.agent import Agent
+from src.agent.answer_cache import answer_cache
+from src.agent.context import build_context, schedule_summary_refresh
+from src.agent.db_model import Conversation
+from src.agent.pool import agent_pool
+from src.agent.routing import route_latency
+from src.agent.service import AsyncAgentService
+from src.agent.stream_buffer import TurnStream, stream_buffer
+from src.agent.telemetry import PHASE_SECONDS, TurnStats
+from src.core.config import (
+    AGENT_CONTEXT_SUMMARY_MIN_MESSAGES,
+    AGENT_QUEUE_MAX_WAIT_SECONDS,
+    AGENT_QUEUE_RETRY_AFTER_SECONDS,
+)
+from src.core.database import AsyncSessionLocal
+from src.core.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+ABANDONED_TURNS = Counter(
+    "agent_turns_abandoned_total", "Chat turns cancelled after every client disconnected"
+)
+
+# Keeps running turns and their shielded saves referenced until they finish
+_turn_tasks: set[asyncio.Task] = set()
+
+
+async def _generate_title(agent: Agent, conversation_id: str, message: str) -> str | None:
+    """Generate and persist a conversation title independently of the answer stream.
+
+    Failures are logged and give None: a missing title must not cost the user the answer.
+    """
+    started = time.perf_counter()
+    try:
+        title = await agent.generate_title(message)
+        PHASE_SECONDS.observe(time.perf_counter() - started, phase="title")
+        async with AsyncSessionLocal() as db:
+            await AsyncAgentService(db).update_title(conversation_id, title)
+    except Exception:
+        logger.exception("Title generation failed for conversation %s", conversation_id)
+        return None
+    return title
+
+
+async def _save_turn(
+    conversation_id: str,
+    content: str,
+    blocks: list[tuple[str, str, str | None]],
+    stats: TurnStats,
+    truncated: bool,
+) -> list[str]:
+    """Persist the assistant turn on its own session, so it can run shielded from cancels."""
+    async with AsyncSessionLocal() as db:
+        _, block_ids = await AsyncAgentService(db).save_assistant_turn(
+            conversation_id, content, blocks, stats, truncated=truncated
+        )
+    return block_ids
+
+
+async def _turn_events(
+    ticket: Ticket, conversation: Conversation, message: str
+) -> AsyncIterator[dict]:
+    """Events of one chat turn, from queueing through persistence and the title."""
+    conversation_id = conversation.id
+
+    # Hold the turn until an LLM slot frees up, reporting the queue position
+    last_position = None
+    while not ticket.admitted:
+        if time.monotonic() - ticket.enqueued_at >= AGENT_QUEUE_MAX_WAIT_SECONDS:
+            yield {
+                "type": "error",
+                "code": "queue_timeout",
+                "retry_after": AGENT_QUEUE_RETRY_AFTER_SECONDS,
+            }
+            return
+        if ticket.position != last_position:
+            last_position = ticket.position
+            yield {"type": "queued", "position": last_position}
+        await ticket.wait(timeout=1.0)
+
+    async with agent_pool.acquire() as agent:
+        # The session closes before streaming starts: holding its pooled connection
+        # across the LLM stream would cap concurrent turns at the pool size
+        async with AsyncSessionLocal() as db:
+            service = AsyncAgentService(db)
+
+            # Assemble history server-side within the token budget (before this turn's message)
+            context = await build_context(service, conversation)
+
+            # Save user message
+            await service.add_message(conversation_id, "user", message)
+
+            # Check if this is the first message (for title generation)
+            should_generate_title = await service.is_first_message(conversation_id)
+
+        # Title generation runs alongside the answer and is sent whenever it is ready
+        title_task = None
+        title_sent = False
+        if should_generate_title:
+            title_task = asyncio.create_task(_generate_title(agent, conversation_id, message))
+
+        # Track blocks in chronological order
+        content_blocks = []  # List of (type, content, tool_name) tuples
+        current_text = ""
+        all_text = ""  # For message.content
+
+        stats = TurnStats()
+        truncated = cancelled = False
+        try:
+            async for event in answer_cache.run(
+                agent,
+                message=message,
+                conversation_history=context.history,
+                stats=stats,
+            ):
+                yield event
+                if title_task and not title_sent and title_task.done():
+                    title_sent = True
+                    if title_task.result():
+                        yield {"type": "title", "title": title_task.result()}
+
+                # Build blocks in chronological order
+                if event["type"] == "text_delta":
+                    current_text += event["content"]
+                    all_text += event["content"]
+                elif event["type"] == "tool_use_end" and not event.get("is_error"):
+                    # Save accumulated text as a block before the tool use
+                    if current_text:
+                        content_blocks.append(("text", current_text, None))
+                        current_text = ""
+                    # Save tool use block
+                    content_blocks.append(("tool_use", event.get("result", ""), event.get("tool")))
+        except asyncio.CancelledError:
+            # Every client is gone or one cancelled the turn: the LLM stream, pending tool
+            # calls and the title are dropped, and what was produced so far is kept
+            # as a truncated answer. The cancellation is re-raised once that is saved
+            truncated = cancelled = True
+            if title_task and not title_task.done():
+                title_task.cancel()
+            ABANDONED_TURNS.inc()
+            if not all_text and not content_blocks:
+                raise
+
+        stats.finish()
+        if stats.route:
+            route_latency.record(stats)
+
+        # Save any remaining text after the last tool use
+        if current_text:
+            content_blocks.append(("text", current_text, None))
+
+        # Save the assistant message and its blocks in one transaction; shielded so a
+        # (further) cancel while writing can't lose the answer
+        save = asyncio.ensure_future(
+            _save_turn(conversation_id, all_text, content_blocks, stats, truncated)
+        )
+        _turn_tasks.add(save)
+        save.add_done_callback(_turn_tasks.discard)
+        with stats.span("db"):
+            block_ids = await asyncio.shield(save)
+        if len(context.overflow) >= AGENT_CONTEXT_SUMMARY_MIN_MESSAGES:
+            schedule_summary_refresh(agent, conversation_id)
+
+        # Emit card_saved for tool_use blocks
+        for block_id, (block_type, content, tool_name) in zip(block_ids, content_blocks, strict=True):
+            if block_type == "tool_use":
+                yield {
+                    "type": "card_saved",
+                    "content_block_id": block_id,
+                    "tool": tool_name,
+                    "result": content,
+                }
+
+        title = None
+        if title_task and title_task.done() and not title_task.cancelled():
+            title = title_task.result()
+            title_sent = True
+
+        yield {"type": "done", "title": title, "truncated": truncated}
+        if cancelled:
+            raise asyncio.CancelledError
+
+        # Deliver a title that wasn't ready yet after done, without holding it up
+        if title_task and not title_sent and not truncated:
+            title = await title_task
+            if title:
+                yield {"type": "title", "title": title}
+
+
+async def _run_turn(
+    turn: TurnStream, ticket: Ticket, conversation: Conversation, message: str
+) -> None:
+    try:
+        async for event in _turn_events(ticket, conversation, message):
+            turn.append({**event, "conversation_id": conversation.id})
+    except Exception:
+        logger.exception("Chat turn failed for conversation %s", conversation.id)
+        turn.append({"type": "error", "code": "internal_error", "conversation_id": conversation.id})
+    finally:
+        ticket.release()
+        turn.finish()
+
+
+def start_turn(ticket: Ticket, conversation: Conversation, user_id: str, message: str) -> TurnStream:
+    """Run a chat turn in the background and return the buffered stream of its events.
+
+    The turn is decoupled from the HTTP response, so a client that drops the connection
+    can reattach with Last-Event-ID and the answer is still generated and saved once.
+    If nobody reattaches within the grace period the turn is cancelled and cut short.
+    """
+    turn = stream_buffer.open(conversation.id, user_id)
+    task = asyncio.create_task(_run_turn(turn, ticket, conversation, message))
+    turn.on_cancel = task.cancel
+    _turn_tasks.add(task)
+    task.add_done_callback(_turn_tasks.discard)
+    return turn
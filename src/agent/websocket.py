@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from src.agent.admission import AdmissionRejectedError, admit_turn
+from src.agent.models import ChatRequest
+from src.agent.service import AsyncAgentService
+from src.agent.stream_buffer import EventsExpiredError, TurnStream
+from src.agent.turn import start_turn
+from src.core.config import (
+    AGENT_WS_AUTH_TIMEOUT_SECONDS,
+    AGENT_WS_HEARTBEAT_SECONDS,
+    AGENT_WS_MAX_TURNS,
+    ALLOWED_ORIGINS,
+)
+from src.core.database import AsyncSessionLocal
+from src.core.metrics import Counter, Gauge
+from src.core.security import verify_token
+from src.user.db_model import User
+
+logger = logging.getLogger(__name__)
+
+OPEN_SOCKETS = Gauge("agent_websockets_open", "Authenticated chat WebSocket connections")
+SOCKET_TURNS = Counter(
+    "agent_websocket_turns_total",
+    "Chat turns requested over WebSockets by outcome",
+    labelnames=("outcome",),
+)
+
+# Frames waiting to be written per socket; a slow client holds back its own turns only
+OUTBOX_SIZE = 256
+
+
+async def _load_user(token: str | None) -> User | None:
+    payload = verify_token(token) if token else None
+    user_id = payload.get("sub") if payload else None
+    if not user_id:
+        return None
+    async with AsyncSessionLocal() as db:
+        return await db.get(User, user_id)
+
+
+async def authenticate(websocket: WebSocket, cookie_token: str | None) -> User | None:
+    """Authenticate an accepted socket once, from the session cookie or an auth frame.
+
+    Browsers send cookies on cross-site WebSocket handshakes and CORS doesn't apply, so
+    the cookie is only trusted from an allowed origin. Other clients send
+    {"type": "auth", "token": ...} as their first frame instead.
+    """
+    origin = websocket.headers.get("origin")
+    if cookie_token and (origin is None or origin in ALLOWED_ORIGINS):
+        return await _load_user(cookie_token)
+    try:
+        frame = await asyncio.wait_for(websocket.receive_json(), AGENT_WS_AUTH_TIMEOUT_SECONDS)
+    except (TimeoutError, ValueError, KeyError):
+        # KeyError: a binary frame, which has no text to parse
+        return None
+    if not isinstance(frame, dict) or frame.get("type") != "auth":
+        return None
+    return await _load_user(frame.get("token"))
+
+
+class ChatConnection:
+    """One authenticated WebSocket carrying any number of concurrent chat turns.
+
+    Client frames:
+        {"type": "chat", "request_id": ..., "message": ..., "conversation_id": ...}
+        {"type": "cancel", "request_id": ...}
+        {"type": "ping"}
+
+    Every event of a turn is sent as the SSE event dict plus its `request_id` and the
+    SSE `id`, so a turn cut off with the socket can still be resumed over
+    GET /conversations/{id}/stream. Turns outlive the socket for the disconnect grace
+    period, like SSE streams.
+    """
+
+    def __init__(self, websocket: WebSocket, user: User):
+        self.websocket = websocket
+        self.user = user
+        self.turns: dict[str, TurnStream] = {}
+        self._relays: set[asyncio.Task] = set()
+        self._outbox: asyncio.Queue[dict] = asyncio.Queue(maxsize=OUTBOX_SIZE)
+
+    async def serve(self) -> None:
+        OPEN_SOCKETS.inc()
+        writer = asyncio.create_task(self._write())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await self._send({"type": "ready"})
+            while True:
+                try:
+                    frame = await self.websocket.receive_json()
+                except json.JSONDecodeError:
+                    await self._send({"type": "error", "code": "bad_request", "detail": "Invalid JSON"})
+                    continue
+                except KeyError:
+                    await self._send(
+                        {"type": "error", "code": "bad_request", "detail": "Frames must be JSON text"}
+                    )
+                    continue
+                await self._handle(frame)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            OPEN_SOCKETS.dec()
+            heartbeat.cancel()
+            writer.cancel()
+            # Stops relaying only: the turns keep running for the grace period
+            for relay in self._relays:
+                relay.cancel()
+
+    async def _send(self, frame: dict) -> None:
+        await self._outbox.put(frame)
+
+    async def _write(self) -> None:
+        while True:
+            frame = await self._outbox.get()
+            try:
+                await self.websocket.send_json(frame)
+            except Exception:
+                # The reader sees the disconnect and tears the connection down
+                logger.debug("Dropping frames for closed chat socket", exc_info=True)
+                return
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(AGENT_WS_HEARTBEAT_SECONDS)
+            await self._send({"type": "heartbeat"})
+
+    async def _error(self, request_id, code: str, detail: str, **extra) -> None:
+        await self._send(
+            {"type": "error", "request_id": request_id, "code": code, "detail": detail, **extra}
+        )
+
+    async def _handle(self, frame) -> None:
+        kind = frame.get("type") if isinstance(frame, dict) else None
+        request_id = frame.get("request_id") if isinstance(frame, dict) else None
+        if kind == "ping":
+            await self._send({"type": "pong"})
+        elif kind == "chat":
+            await self._start(request_id, frame)
+        elif kind == "cancel":
+            turn = self.turns.get(request_id)
+            if turn is None:
+                await self._error(request_id, "not_found", "No turn in flight with this request_id")
+            else:
+                SOCKET_TURNS.inc(outcome="cancelled")
+                turn.cancel()
+        else:
+            await self._error(request_id, "bad_request", f"Unknown frame type: {kind}")
+
+    async def _start(self, request_id, frame: dict) -> None:
+        if not isinstance(request_id, str) or not request_id:
+            await self._error(request_id, "bad_request", "chat frames need a request_id")
+            return
+        if request_id in self.turns:
+            await self._error(request_id, "bad_request", "request_id is already in flight")
+            return
+        if len(self.turns) >= AGENT_WS_MAX_TURNS:
+            SOCKET_TURNS.inc(outcome="rejected")
+            await self._error(request_id, "too_many_turns", "Too many turns in flight on this socket")
+            return
+        try:
+            request = ChatRequest.model_validate(frame)
+        except ValidationError as e:
+            await self._error(request_id, "bad_request", str(e))
+            return
+
+        try:
+            ticket = admit_turn(self.user.id)
+        except AdmissionRejectedError as e:
+            SOCKET_TURNS.inc(outcome="rejected")
+            await self._error(request_id, "rejected", str(e), retry_after=e.retry_after)
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                service = AsyncAgentService(db)
+                if not request.conversation_id:
+                    conversation = await service.create_conversation(self.user.id)
+                else:
+                    conversation = await service.get_conversation(
+                        request.conversation_id, self.user.id
+                    )
+        except Exception:
+            # Only this turn fails; the socket and its other turns carry on
+            ticket.release()
+            logger.exception("Conversation lookup failed for chat socket turn %s", request_id)
+            await self._error(request_id, "internal_error", "Could not load the conversation")
+            return
+        except BaseException:
+            ticket.release()
+            raise
+        if not conversation:
+            ticket.release()
+            await self._error(request_id, "not_found", "Conversation not found")
+            return
+
+        SOCKET_TURNS.inc(outcome="started")
+        turn = start_turn(ticket, conversation, self.user.id, request.message)
+        self.turns[request_id] = turn
+        relay = asyncio.create_task(self._relay(request_id, turn))
+        self._relays.add(relay)
+        relay.add_done_callback(self._relays.discard)
+
+    async def _relay(self, request_id: str, turn: TurnStream) -> None:
+        try:
+            async for seq, event in turn.follow():
+                await self._send({**event, "request_id": request_id, "id": turn.event_id(seq)})
+        except EventsExpiredError:
+            # This socket fell behind the ring buffer; the client reloads from the DB
+            await self._error(
+                request_id,
+                "stream_expired",
+                "Events are no longer buffered",
+                conversation_id=turn.conversation_id,
+            )
+        finally:
+            self.turns.pop(request_id, None)
@@ -26,3 +26,70 @@ FROM_EMAIL = os.getenv("FROM_EMAIL", "Play8 <noreply@play8.ai>")
 # Environment
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 IS_PRODUCTION = ENVIRONMENT == "production"
+
+# Browser origins allowed to call the API with credentials (CORS and WebSockets)
+ALLOWED_ORIGINS = [
+    "https://play8.ai",
+    "https://admin.play8.ai",
+    "https://www.play8.ai",
+    "http://localhost:3011",
+    "http://localhost:5173",  # Vite default dev server
+    "http://localhost:3000",  # Common React dev server
+    "http://localhost:5174",  # Admin frontend (Vite dev server alternative port)
+]
+
+# AI Agent
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# Smaller model for greetings and short technique questions; empty keeps every turn
+# on the default chat model
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "")
+AGENT_FAST_MODEL_MAX_CHARS = int(os.getenv("AGENT_FAST_MODEL_MAX_CHARS", "280"))
+# "fake" replays recorded streams (and deterministic embeddings) for load tests
+AGENT_LLM_BACKEND = os.getenv("AGENT_LLM_BACKEND", "openai")
+AGENT_FAKE_LLM_RECORDINGS = os.getenv("AGENT_FAKE_LLM_RECORDINGS", "")  # JSON file
+AGENT_FAKE_LLM_FIRST_TOKEN_MS = float(os.getenv("AGENT_FAKE_LLM_FIRST_TOKEN_MS", "400"))
+AGENT_FAKE_LLM_TOKEN_DELAY_MS = float(os.getenv("AGENT_FAKE_LLM_TOKEN_DELAY_MS", "20"))
+AGENT_MAX_CONCURRENT_STREAMS = int(os.getenv("AGENT_MAX_CONCURRENT_STREAMS", "32"))
+# One warm agent per admitted stream, so turns under full load never build cold
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", str(AGENT_MAX_CONCURRENT_STREAMS)))
+AGENT_HTTP_MAX_CONNECTIONS = int(os.getenv("AGENT_HTTP_MAX_CONNECTIONS", "100"))
+AGENT_HTTP_KEEPALIVE_SECONDS = float(os.getenv("AGENT_HTTP_KEEPALIVE_SECONDS", "60"))
+AGENT_TOOL_THREADS = int(os.getenv("AGENT_TOOL_THREADS", "8"))
+AGENT_TOOL_TIMEOUT_SECONDS = float(os.getenv("AGENT_TOOL_TIMEOUT_SECONDS", "30"))
+AGENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "6000"))
+AGENT_CONTEXT_MAX_MESSAGES = int(os.getenv("AGENT_CONTEXT_MAX_MESSAGES", "200"))
+AGENT_CONTEXT_SUMMARY_MIN_MESSAGES = int(os.getenv("AGENT_CONTEXT_SUMMARY_MIN_MESSAGES", "6"))
+# Finish the turn without a follow-up LLM call when only generator tools were called
+AGENT_SKIP_GENERATOR_FOLLOWUP = os.getenv("AGENT_SKIP_GENERATOR_FOLLOWUP", "true").lower() == "true"
+# Send the model an ID and summary instead of the full generator output
+AGENT_COMPACT_TOOL_RESULTS = os.getenv("AGENT_COMPACT_TOOL_RESULTS", "true").lower() == "true"
+# Tool rounds per turn; past any of these budgets the next completion must answer
+AGENT_MAX_TOOL_STEPS = int(os.getenv("AGENT_MAX_TOOL_STEPS", "3"))
+AGENT_TURN_TOKEN_BUDGET = int(os.getenv("AGENT_TURN_TOKEN_BUDGET", "40000"))
+AGENT_TURN_TIME_BUDGET_SECONDS = float(os.getenv("AGENT_TURN_TIME_BUDGET_SECONDS", "60"))
+# Answer fully specified session requests with the rule-based drill engine
+AGENT_LOCAL_DRILL_ENGINE = os.getenv("AGENT_LOCAL_DRILL_ENGINE", "true").lower() == "true"
+AGENT_MAX_QUEUED_STREAMS = int(os.getenv("AGENT_MAX_QUEUED_STREAMS", "64"))
+AGENT_MAX_STREAMS_PER_USER = int(os.getenv("AGENT_MAX_STREAMS_PER_USER", "2"))  # 0 disables
+AGENT_QUEUE_MAX_WAIT_SECONDS = float(os.getenv("AGENT_QUEUE_MAX_WAIT_SECONDS", "30"))
+AGENT_QUEUE_RETRY_AFTER_SECONDS = int(os.getenv("AGENT_QUEUE_RETRY_AFTER_SECONDS", "5"))
+# Replay buffer for resuming dropped chat streams
+AGENT_STREAM_BUFFER_EVENTS = int(os.getenv("AGENT_STREAM_BUFFER_EVENTS", "4096"))  # per turn
+AGENT_STREAM_BUFFER_MAX_TURNS = int(os.getenv("AGENT_STREAM_BUFFER_MAX_TURNS", "1000"))
+AGENT_STREAM_RETENTION_SECONDS = float(os.getenv("AGENT_STREAM_RETENTION_SECONDS", "300"))
+# Cancel a turn once no client has been following it for this long (0 disables)
+AGENT_DISCONNECT_GRACE_SECONDS = float(os.getenv("AGENT_DISCONNECT_GRACE_SECONDS", "15"))
+# Opt-in cache of answers to repeated first-turn questions (text and manual lookups only)
+AGENT_ANSWER_CACHE = os.getenv("AGENT_ANSWER_CACHE", "false").lower() == "true"
+AGENT_ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_ANSWER_CACHE_MAX_ENTRIES", "1000"))
+AGENT_ANSWER_CACHE_TTL_SECONDS = float(os.getenv("AGENT_ANSWER_CACHE_TTL_SECONDS", "21600"))
+AGENT_ANSWER_CACHE_SIMILARITY = float(os.getenv("AGENT_ANSWER_CACHE_SIMILARITY", "0.93"))
+AGENT_ANSWER_CACHE_MAX_QUERY_CHARS = int(os.getenv("AGENT_ANSWER_CACHE_MAX_QUERY_CHARS", "300"))
+# Start manual retrieval alongside the first LLM call when a message looks like a
+# PongBot question; reused when most words of the model's query come from the message
+AGENT_MANUAL_PREFETCH = os.getenv("AGENT_MANUAL_PREFETCH", "true").lower() == "true"
+AGENT_MANUAL_PREFETCH_OVERLAP = float(os.getenv("AGENT_MANUAL_PREFETCH_OVERLAP", "0.75"))
+# WebSocket chat: heartbeat interval, time allowed for the auth frame, turns per socket
+AGENT_WS_HEARTBEAT_SECONDS = float(os.getenv("AGENT_WS_HEARTBEAT_SECONDS", "20"))
+AGENT_WS_AUTH_TIMEOUT_SECONDS = float(os.getenv("AGENT_WS_AUTH_TIMEOUT_SECONDS", "10"))
+AGENT_WS_MAX_TURNS = int(os.getenv("AGENT_WS_MAX_TURNS", "8"))
@@ -1,9 +1,12 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from src.core.config import AGENT_MAX_CONCURRENT_STREAMS
+
 load_dotenv()
 
 # Get database URL from environment variable, with fallback
@@ -17,6 +20,21 @@ engine = create_engine(DATABASE_URL, echo=False)
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) for code that runs on the event loop, e.g. streaming endpoints
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+# Sized from the admission limit so every admitted turn can get a connection for its
+# short reads and writes (plus overflow for titles, summaries and other requests)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    pool_size=AGENT_MAX_CONCURRENT_STREAMS,
+    max_overflow=AGENT_MAX_CONCURRENT_STREAMS // 2,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -30,6 +48,12 @@ def get_db():
         db.close()
 
 
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Context manager for DB session (for scripts)
 from contextlib import contextmanager
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, TypeVar, Generic
+from typing import List, Optional, TypeVar, Generic
 
 T = TypeVar('T')
 
@@ -9,6 +9,13 @@ class PagedResponse(BaseModel, Generic[T]):
     limit: int
     offset: int
 
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset-paginated slice; pass next_cursor back to fetch the following page."""
+    data: List[T]
+    limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
 class DeleteResponse(BaseModel):
     status: str
     id: str
@@ -3,6 +3,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.agent.pool import agent_pool
+from src.core.config import ALLOWED_ORIGINS
 from src.core.database import init_database as create_tables
 from src.routers import register_routers
 
@@ -14,22 +16,17 @@ async def lifespan(app: FastAPI):
     create_tables()
     from init_db import init_sample_data
     init_sample_data()
+    # Warm up tool-bound LLM clients so the first chat doesn't pay for them
+    await agent_pool.start()
     yield
-    # Shutdown: Add cleanup code here if needed
+    # Shutdown: release pooled LLM connections
+    await agent_pool.close()
 
 app = FastAPI(title="Play8 Court Machine Booking API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "https://play8.ai",
-        "https://admin.play8.ai",
-        "https://www.play8.ai",
-        "http://localhost:3011",
-        "http://localhost:5173",  # Vite default dev server
-        "http://localhost:3000",  # Common React dev server
-        "http://localhost:5174",  # Admin frontend (Vite dev server alternative port)
-    ],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -2,8 +2,9 @@ import json
 import os
 
 from langchain_core.tools import tool
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+from src.core.config import AGENT_LLM_BACKEND
 from src.core.database import get_db_context
 from src.manual.repository import ManualRepository
 
@@ -12,8 +13,16 @@ EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSIONS = 1536
 
 
+def _fake_embedding(query: str) -> list[float]:
+    from src.agent.fake_llm import fake_embedding
+
+    return fake_embedding(query, EMBEDDING_DIMENSIONS)
+
+
 def generate_query_embedding(query: str) -> list[float]:
     """Generate embedding for search query."""
+    if AGENT_LLM_BACKEND == "fake":
+        return _fake_embedding(query)
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     response = client.embeddings.create(
         model=EMBEDDING_MODEL, input=query, dimensions=EMBEDDING_DIMENSIONS
@@ -21,6 +30,51 @@ def generate_query_embedding(query: str) -> list[float]:
     return response.data[0].embedding
 
 
+_async_client: AsyncOpenAI | None = None
+
+
+async def agenerate_query_embedding(query: str) -> list[float]:
+    """Async variant of generate_query_embedding for callers on the event loop."""
+    if AGENT_LLM_BACKEND == "fake":
+        return _fake_embedding(query)
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    response = await _async_client.embeddings.create(
+        model=EMBEDDING_MODEL, input=query, dimensions=EMBEDDING_DIMENSIONS
+    )
+    return response.data[0].embedding
+
+
+def search_manual_chunks(query_embedding: list[float], top_k: int = 3) -> list[dict]:
+    """Nearest manual chunks for an embedding, shaped for the tool result."""
+    with get_db_context() as db:
+        repo = ManualRepository(db)
+        results = repo.search_by_embedding(query_embedding, top_k=top_k)
+
+        return [
+            {
+                "section": chunk.section,
+                "content": chunk.content[:1000],  # Limit content length
+                "page": chunk.page_number,
+                "pages": chunk.chunk_metadata.get("pages", []) if chunk.chunk_metadata else [],
+                "image_path": chunk.pdf_page_image_path,
+            }
+            for chunk in results
+        ]
+
+
+def format_manual_results(query: str, results: list[dict]) -> str:
+    return json.dumps(
+        {
+            "query": query,
+            "results": results,
+            "total_results": len(results),
+        },
+        indent=2,
+    )
+
+
 @tool
 def search_pongbot_manual(query: str) -> str:
     """Search the PongBot Pace S Series manual for information.
@@ -47,28 +101,4 @@ def search_pongbot_manual(query: str) -> str:
     query_embedding = generate_query_embedding(query)
 
     # Search database
-    with get_db_context() as db:
-        repo = ManualRepository(db)
-        results = repo.search_by_embedding(query_embedding, top_k=3)
-
-        # Format results
-        formatted_results = []
-        for chunk in results:
-            formatted_results.append(
-                {
-                    "section": chunk.section,
-                    "content": chunk.content[:1000],  # Limit content length
-                    "page": chunk.page_number,
-                    "pages": chunk.chunk_metadata.get("pages", []) if chunk.chunk_metadata else [],
-                    "image_path": chunk.pdf_page_image_path,
-                }
-            )
-
-        return json.dumps(
-            {
-                "query": query,
-                "results": formatted_results,
-                "total_results": len(formatted_results),
-            },
-            indent=2,
-        )
+    return format_manual_results(query, search_manual_chunks(query_embedding))
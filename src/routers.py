@@ -8,6 +8,7 @@ from src.plan.router import router as plan_router
 from src.saved_session.router import router as saved_session_router
 from src.manual.router import router as manual_router
 from src.waiting_list.router import router as waiting_list_router
+from src.core.metrics import router as metrics_router
 
 
 def register_routers(app):
@@ -20,4 +21,5 @@ def register_routers(app):
     app.include_router(plan_router)
     app.include_router(saved_session_router)
     app.include_router(manual_router)
-    app.include_router(waiting_list_router)
\ No newline at end of file
+    app.include_router(waiting_list_router)
+    app.include_router(metrics_router)